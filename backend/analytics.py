@@ -0,0 +1,239 @@
+import os
+import json
+import heapq
+import threading
+from collections import Counter
+from typing import Optional
+from coordination import file_lock
+
+ANALYTICS_PATH = "analytics.json"
+
+# Profile sections tracked for coverage, in the order the frontend renders them
+SECTIONS = [
+    "experience",
+    "education",
+    "skills",
+    "projects",
+    "certifications",
+    "patents",
+    "publications",
+    "languages",
+    "volunteerExperience",
+    "awards",
+]
+
+# Aggregates that are plain key -> count tallies
+COUNTERS = [
+    "companies",
+    "skills",
+    "locations",
+    "institutions",
+    "experience_counts",
+    "education_counts",
+    "section_coverage",
+]
+
+def empty_state() -> dict:
+    """Return an analytics state with no profiles counted."""
+    state = {name: Counter() for name in COUNTERS}
+    state["total_profiles"] = 0
+    state["source"] = None
+    return state
+
+def _entries(profile: dict, section: str) -> list:
+    """Return a profile section as a list, tolerating missing or null values."""
+    value = profile.get(section)
+    return value if isinstance(value, list) else []
+
+def _label(entry, field: Optional[str] = None) -> Optional[str]:
+    """
+    Return an LLM-extracted value usable as a counter key, or None.
+
+    Gemini sometimes returns objects or lists where a string is expected;
+    those are skipped rather than counted (they are not hashable either).
+    """
+    value = entry.get(field) if field and isinstance(entry, dict) else entry
+    return value if isinstance(value, str) and value else None
+
+def profile_contributions(profile: dict) -> dict:
+    """
+    Compute what a single profile adds to each aggregate.
+
+    Args:
+        profile: Profile dict as stored in tempfile.txt
+
+    Returns:
+        dict: Counter per aggregate name
+    """
+    experience = _entries(profile, "experience")
+    education = _entries(profile, "education")
+
+    contributions = {name: Counter() for name in COUNTERS}
+    labelled = [
+        ("companies", experience, "company"),
+        ("institutions", education, "institution"),
+        ("skills", _entries(profile, "skills"), None),
+    ]
+    for name, entries, field in labelled:
+        for entry in entries:
+            label = _label(entry, field)
+            if label:
+                contributions[name][label] += 1
+    location = _label(profile, "location")
+    if location:
+        contributions["locations"][location] += 1
+
+    contributions["experience_counts"][str(len(experience))] += 1
+    contributions["education_counts"][str(len(education))] += 1
+    for section in SECTIONS:
+        if _entries(profile, section):
+            contributions["section_coverage"][section] += 1
+
+    return contributions
+
+def apply_profile(state: dict, profile: Optional[dict], sign: int = 1) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) a profile's contribution to the state in place.
+    """
+    # Parse-failure records ({"error": ..., "raw_response": ...}) are not profiles
+    if not isinstance(profile, dict) or "error" in profile:
+        return
+
+    for name, counts in profile_contributions(profile).items():
+        target = state[name]
+        for key, count in counts.items():
+            target[key] += sign * count
+            if target[key] <= 0:
+                del target[key]
+    state["total_profiles"] = max(0, state["total_profiles"] + sign)
+
+def rebuild_analytics(profiles: list) -> dict:
+    """Build the analytics state from scratch for a full list of profiles."""
+    state = empty_state()
+    for profile in profiles:
+        apply_profile(state, profile)
+    return state
+
+def source_signature(source_path: str) -> Optional[list]:
+    """Return the (mtime, size) of the profile store, used to detect outside edits."""
+    try:
+        stat = os.stat(source_path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def load_analytics(path: str = ANALYTICS_PATH) -> Optional[dict]:
+    """Load the persisted analytics state, or None if it is missing or unreadable."""
+    try:
+        with open(path, 'r') as f:
+            raw = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    state = empty_state()
+    for name in COUNTERS:
+        state[name] = Counter(raw.get(name, {}))
+    state["total_profiles"] = raw.get("total_profiles", 0)
+    state["source"] = raw.get("source")
+    return state
+
+def save_analytics(state: dict, path: str = ANALYTICS_PATH) -> None:
+    """Persist the analytics state, replacing the previous file atomically."""
+    raw = {name: dict(state[name]) for name in COUNTERS}
+    raw["total_profiles"] = state["total_profiles"]
+    raw["source"] = state["source"]
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(raw, f)
+    os.replace(tmp_path, path)
+
+def record_upsert(old_profile: Optional[dict], new_profile: dict, source_path: str, previous_source: Optional[list], path: str = ANALYTICS_PATH) -> None:
+    """
+    Update the stored aggregates after a single profile was upserted into the store.
+
+    Args:
+        old_profile: The version that was replaced, or None for a new profile
+        new_profile: The version that was written
+        source_path: Path of the profile store that was just written
+        previous_source: source_signature() of the store taken before the write
+        path: Path of the analytics file
+    """
+    state = load_analytics(path)
+    if state is None or state["source"] != previous_source:
+        # Nothing up to date to apply the change to; the next read rebuilds from the store
+        return
+
+    apply_profile(state, old_profile, sign=-1)
+    apply_profile(state, new_profile)
+    state["source"] = source_signature(source_path)
+    save_analytics(state, path)
+
+def record_rebuild(profiles: list, source_path: str, path: str = ANALYTICS_PATH, source: Optional[list] = None) -> dict:
+    """
+    Recompute and persist the aggregates for a freshly written profile store.
+
+    Callers must hold the store's lock, so no upsert lands between writing or
+    reading the profiles and tagging the state with the store's signature.
+    Pass source when the signature was taken from the file that was read.
+    """
+    state = rebuild_analytics(profiles)
+    state["source"] = source if source is not None else source_signature(source_path)
+    save_analytics(state, path)
+    return state
+
+def current_analytics(source_path: str, path: str = ANALYTICS_PATH) -> dict:
+    """
+    Return the analytics state for the profile store, rebuilding it only when the
+    persisted state is missing or the store was changed outside of record_upsert.
+    """
+    state = load_analytics(path)
+    if state is not None and state["source"] == source_signature(source_path):
+        return state
+
+    # A shared lock keeps upserts, and their record_upsert deltas, out until the
+    # rebuilt state is saved with the signature of the file it was built from
+    with file_lock(source_path, shared=True):
+        try:
+            with open(source_path, 'r') as f:
+                stat = os.fstat(f.fileno())
+                content = f.read().strip()
+            source = [stat.st_mtime_ns, stat.st_size]
+            profiles = json.loads(content) if content else []
+        except FileNotFoundError:
+            source = None
+            profiles = []
+
+        return record_rebuild(profiles, source_path, path, source)
+
+def _top(counts: Counter, limit: int, key_name: str) -> list:
+    """Return the most common entries, breaking ties alphabetically for stable output."""
+    top = heapq.nsmallest(limit, counts.items(), key=lambda item: (-item[1], item[0]))
+    return [{key_name: key, "count": count} for key, count in top]
+
+def _histogram(counts: Counter, key_name: str) -> list:
+    """Return a count histogram sorted by bucket."""
+    return [{key_name: int(bucket), "count": count} for bucket, count in sorted(counts.items(), key=lambda item: int(item[0]))]
+
+def summarize(state: dict, limit: int = 10) -> dict:
+    """
+    Shape the analytics state into the response served by /analytics.
+
+    Args:
+        state: Analytics state
+        limit: Number of entries to return for each top-N list
+
+    Returns:
+        dict: Top companies, skills, locations and institutions, histograms and coverage
+    """
+    coverage = state["section_coverage"]
+    return {
+        "totalProfiles": state["total_profiles"],
+        "topCompanies": _top(state["companies"], limit, "company"),
+        "topSkills": _top(state["skills"], limit, "skill"),
+        "topLocations": _top(state["locations"], limit, "location"),
+        "topInstitutions": _top(state["institutions"], limit, "institution"),
+        "experienceHistogram": _histogram(state["experience_counts"], "experienceCount"),
+        "educationHistogram": _histogram(state["education_counts"], "educationCount"),
+        "sectionCoverage": {section: coverage.get(section, 0) for section in SECTIONS},
+    }
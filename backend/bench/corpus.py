@@ -0,0 +1,169 @@
+"""
+Synthetic LinkedIn-like corpus for the benchmarks.
+
+Everything is generated from a seed so that two runs compare like with like.
+"""
+import json
+import random
+from pathlib import Path
+from typing import Union
+
+FIRST_NAMES = ["Ada", "Grace", "Alan", "Linus", "Margaret", "Satya", "Bill", "Sundar", "Frances", "Barbara", "Ken", "Radia"]
+LAST_NAMES = ["Lovelace", "Hopper", "Turing", "Torvalds", "Hamilton", "Nadella", "Gates", "Pichai", "Allen", "Liskov", "Thompson", "Perlman"]
+COMPANIES = ["Microsoft", "Google", "Amazon", "Meta", "Stripe", "Gates Foundation", "OpenAI", "Netflix", "Shopify", "Atlassian", "Grab", "Sea"]
+TITLES = ["Software Engineer", "Product Manager", "Director", "Founder", "Data Scientist", "CEO", "Board Member", "Researcher"]
+INSTITUTIONS = ["Harvard University", "Stanford University", "MIT", "National University of Singapore", "University of Chicago", "ETH Zurich"]
+DEGREES = ["Bachelor of Science", "Master of Science", "MBA", "PhD", "Bachelor of Arts"]
+FIELDS = ["Computer Science", "Economics", "Electrical Engineering", "Business Administration", "Mathematics"]
+LOCATIONS = ["Seattle, Washington, United States", "Singapore", "London, England, United Kingdom", "San Francisco, California, United States", "Berlin, Germany"]
+SKILLS = ["Python", "Leadership", "Strategy", "Machine Learning", "Distributed Systems", "Public Speaking", "Negotiation", "SQL", "Go", "Rust"]
+WORDS = "platform growth scale customers teams impact mission product engineering research partners global strategy".split()
+
+# Page size presets: experience/education entries and bytes of script/JSON noise per page
+SIZES = {
+    "small": {"experience": 3, "education": 1, "noise": 50_000},
+    "medium": {"experience": 8, "education": 3, "noise": 400_000},
+    "large": {"experience": 20, "education": 5, "noise": 1_300_000},
+}
+
+def profile_slug(index: int) -> str:
+    """Return the LinkedIn vanity name used for the synthetic profile at index."""
+    return f"alumni-{index:06d}"
+
+def profile_url(index: int) -> str:
+    return f"https://www.linkedin.com/in/{profile_slug(index)}"
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def make_profile(index: int, size: str = "small", seed: int = 0) -> dict:
+    """
+    Build a profile dict shaped like the ones Gemini extracts into tempfile.txt.
+
+    Args:
+        index: Profile number, also used for the URL
+        size: One of SIZES
+        seed: Corpus seed
+    """
+    rng = random.Random(f"{seed}-{index}")
+    preset = SIZES[size]
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    return {
+        "name": name,
+        "headline": f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}",
+        "location": rng.choice(LOCATIONS),
+        "experience": [
+            {
+                "title": rng.choice(TITLES),
+                "company": rng.choice(COMPANIES),
+                "duration": f"{2000 + i} - {2001 + i}",
+                "location": rng.choice(LOCATIONS),
+                "description": _sentence(rng),
+            }
+            for i in range(rng.randint(1, preset["experience"]))
+        ],
+        "education": [
+            {
+                "institution": rng.choice(INSTITUTIONS),
+                "degree": rng.choice(DEGREES),
+                "field": rng.choice(FIELDS),
+                "duration": f"{1990 + i} - {1994 + i}",
+                "description": "",
+            }
+            for i in range(rng.randint(1, preset["education"]))
+        ],
+        "skills": rng.sample(SKILLS, rng.randint(0, len(SKILLS))),
+        "projects": [],
+        "certifications": [],
+        "patents": [],
+        "publications": [],
+        "languages": [],
+        "volunteerExperience": [],
+        "awards": [],
+        "linkedinUrl": profile_url(index),
+    }
+
+def make_profiles(count: int, size: str = "small", seed: int = 0) -> list:
+    return [make_profile(index, size, seed) for index in range(count)]
+
+def render_html(profile: dict, size: str = "small", seed: int = 0) -> str:
+    """
+    Render a profile as a page resembling a saved LinkedIn profile: deeply nested
+    markup around the visible text, plus inline scripts, styles and JSON blobs
+    that clean_html has to strip.
+    """
+    rng = random.Random(f"{seed}-{profile['linkedinUrl']}-html")
+    noise_budget = SIZES[size]["noise"]
+
+    parts = [
+        '<html lang="en" class="theme theme--mercado artdeco"><head>',
+        f"<title>{profile['name']} | LinkedIn</title>",
+        '<meta charset="utf-8"><link rel="stylesheet" href="https://static.licdn.com/x.css">',
+        "<style>.artdeco-card{margin:0}.pv-top-card{padding:0}</style>",
+        "</head><body><header><nav><button>Home</button><button>My Network</button></nav></header><main>",
+        '<section class="artdeco-card"><div class="ph5"><div><div>',
+        f"<h1>{profile['name']}</h1><div><span>{profile['headline']}</span></div>",
+        f"<div><span>{profile['location']}</span></div></div></div></div></section>",
+    ]
+
+    parts.append('<section class="artdeco-card"><div><h2><span>Experience</span></h2><ul>')
+    for exp in profile["experience"]:
+        parts.append(
+            f"<li><div><div><span>{exp['title']}</span></div><div><span>{exp['company']}</span></div>"
+            f"<div><span>{exp['duration']}</span></div><div><span>{exp['location']}</span></div>"
+            f"<div><p>{exp['description']}</p></div></div></li>"
+        )
+    parts.append("</ul></div></section>")
+
+    parts.append('<section class="artdeco-card"><div><h2><span>Education</span></h2><ul>')
+    for edu in profile["education"]:
+        parts.append(
+            f"<li><div><span>{edu['institution']}</span><span>{edu['degree']}, {edu['field']}</span>"
+            f"<span>{edu['duration']}</span></div></li>"
+        )
+    parts.append("</ul></div></section>")
+
+    if profile["skills"]:
+        parts.append('<section class="artdeco-card"><h2><span>Skills</span></h2><ul>')
+        parts.extend(f"<li><span>{skill}</span></li>" for skill in profile["skills"])
+        parts.append("</ul></section>")
+
+    # Script bundles and embedded JSON state make up most of a real saved page
+    written = sum(len(part) for part in parts)
+    while written < noise_budget:
+        blob = json.dumps({"data": {"entityUrn": f"urn:li:fsd_profile:{rng.getrandbits(64):x}", "text": _sentence(rng, 40)}})
+        chunk = f'<code style="display: none"><!--{blob}--></code><code>{blob}</code><script>var x={blob};</script>'
+        chunk += f'<div class="feed"><div><div><span>{_sentence(rng)}</span></div></div></div>'
+        parts.append(chunk)
+        written += len(chunk)
+
+    parts.append("</main><footer><p>LinkedIn Corporation</p></footer></body></html>")
+    return "".join(parts)
+
+def write_html_corpus(directory: Union[str, Path], count: int, size: str = "small", seed: int = 0) -> list:
+    """Write count synthetic pages named like save_html output and return their paths."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(count):
+        profile = make_profile(index, size, seed)
+        path = directory / f"{profile_slug(index)}_20250608_000000.html"
+        path.write_text(render_html(profile, size, seed), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+def write_chopped_corpus(directory: Union[str, Path], count: int, size: str = "small", seed: int = 0) -> None:
+    """Write count cleaned-text files as process_html_files would leave them."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for index in range(count):
+        profile = make_profile(index, size, seed)
+        lines = [profile["name"], profile["headline"], profile["location"], "Experience"]
+        for exp in profile["experience"]:
+            lines += [exp["title"], exp["company"], exp["duration"], exp["description"]]
+        lines.append("Education")
+        for edu in profile["education"]:
+            lines += [edu["institution"], f"{edu['degree']}, {edu['field']}", edu["duration"]]
+        lines += ["Skills"] + profile["skills"]
+        (directory / f"{profile_slug(index)}_20250608_000000.txt").write_text("\n".join(lines), encoding="utf-8")
@@ -0,0 +1,154 @@
+"""
+Local stand-in for the Gemini generateContent API.
+
+Point the backend at it with GEMINI_BASE_URL. Latency and error rate are
+configurable so benchmarks can model a slow or flaky upstream.
+
+    python -m bench.fake_gemini --port 8765 --latency-ms 300 --error-rate 0.05
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def _prompt_text(body: dict) -> str:
+    contents = body.get("contents", [])
+    return "".join(part.get("text", "") for content in contents for part in content.get("parts", []))
+
+def _extraction_answer(prompt: str) -> str:
+    """Answer an extraction prompt with a profile built from the first lines of its data."""
+    data = prompt.split("Data:", 1)[-1].strip().splitlines()
+    name, headline, location = (data + ["", "", ""])[:3]
+    profile = {
+        "name": name,
+        "headline": headline,
+        "location": location,
+        "experience": [{"title": "Engineer", "company": "Microsoft", "duration": "2020 - Present", "location": location, "description": ""}],
+        "education": [{"institution": "Harvard University", "degree": "Bachelor of Science", "field": "Computer Science", "duration": "2014 - 2018", "description": ""}],
+        "skills": ["Python", "Leadership"],
+        "projects": [],
+        "certifications": [],
+        "patents": [],
+        "publications": [],
+        "languages": [],
+        "volunteerExperience": [],
+        "awards": [],
+    }
+    return "```json\n" + json.dumps(profile, indent=2) + "\n```"
+
+class FakeGemini:
+    """
+    Threaded HTTP server answering generateContent calls.
+
+    Args:
+        latency_ms: Mean delay added to every response
+        jitter_ms: Uniform +/- jitter around latency_ms
+        error_rate: Fraction of requests answered with 503
+        port: Port to bind, 0 picks a free one
+        seed: Seed for jitter and error sampling
+    """
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0, port: int = 0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _sample(self):
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                delay, fail = fake._sample()
+                time.sleep(delay)
+
+                if fail:
+                    payload = {"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}}
+                    return self._send(503, payload)
+
+                prompt = _prompt_text(body)
+                if "Extract all relevant information" in prompt:
+                    text = _extraction_answer(prompt)
+                else:
+                    text = "Based on the alumni data, several alumni have worked at Microsoft."
+                prompt_tokens = len(prompt) // 4
+                output_tokens = len(text) // 4
+                payload = {
+                    "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+                    "usageMetadata": {
+                        "promptTokenCount": prompt_tokens,
+                        "candidatesTokenCount": output_tokens,
+                        "totalTokenCount": prompt_tokens + output_tokens,
+                    },
+                }
+                self._send(200, payload)
+
+            def _send(self, status: int, payload: dict):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeGemini":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Gemini API server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    fake = FakeGemini(args.latency_ms, args.jitter_ms, args.error_rate, args.port)
+    print(f"Fake Gemini listening on {fake.url} (set GEMINI_BASE_URL={fake.url})")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Concurrency load test: health-check latency while /chat requests are in flight.
+
+Fires concurrent /chat requests at the app against a slow fake Gemini server
+and probes / throughout. With blocking work kept off the event loop the
+health check stays flat; if a handler blocks the loop, every probe waits for
+the slowest chat to finish.
+
+    cd backend
+    python -m bench.load_health --chats 8 --llm-latency-ms 1000
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import httpx
+
+from bench import corpus
+from bench.fake_gemini import FakeGemini
+from bench.run import latency_summary
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list:
+    """
+    Hit / every interval seconds until stop is set and return the latencies.
+
+    Latency is measured from when the probe was due rather than when it started,
+    so time the event loop spent blocked before it could send the probe counts.
+    """
+    samples = []
+    due = time.perf_counter()
+    while not stop.is_set():
+        response = await client.get("/")
+        samples.append(time.perf_counter() - due)
+        assert response.status_code == 200, response.text
+        due = max(due + interval, time.perf_counter())
+        await asyncio.sleep(due - time.perf_counter())
+    return samples
+
+async def run_load(app, chats: int, probe_seconds: float, interval: float) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        # Warm up imports and the shared Gemini client so they don't count as load
+        await client.post("/chat", json={"query": "warm up"})
+
+        # Idle baseline
+        stop = asyncio.Event()
+        idle = asyncio.create_task(probe_health(client, stop, interval))
+        await asyncio.sleep(probe_seconds)
+        stop.set()
+        idle_samples = await idle
+
+        # Same probe while the chats are running
+        stop = asyncio.Event()
+        loaded = asyncio.create_task(probe_health(client, stop, interval))
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/chat", json={"query": f"Question {index}"}) for index in range(chats)))
+        chat_wall = time.perf_counter() - start
+        stop.set()
+        loaded_samples = await loaded
+
+    failed = sum(1 for response in responses if response.status_code != 200 or not response.json().get("success"))
+    return {
+        "health_idle": latency_summary(idle_samples),
+        "health_under_load": latency_summary(loaded_samples),
+        "chat": {"count": chats, "failed": failed, "wall_s": chat_wall},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Health-check latency under concurrent /chat load.")
+    parser.add_argument("--chats", type=int, default=8, help="Concurrent /chat requests")
+    parser.add_argument("--profiles", type=int, default=1000, help="Profiles in the store")
+    parser.add_argument("--llm-latency-ms", type=float, default=1000, help="Latency of the fake Gemini server")
+    parser.add_argument("--probe-seconds", type=float, default=1.0, help="Length of the idle baseline")
+    parser.add_argument("--interval-ms", type=float, default=20, help="Delay between health probes")
+    parser.add_argument("--max-p99-ms", type=float, default=100, help="Fail if loaded health p99 exceeds this")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    workspace = Path(tempfile.mkdtemp(prefix="asb-load-"))
+    previous_cwd = os.getcwd()
+    fake = FakeGemini(args.llm_latency_ms).start()
+    os.environ["GEMINI_API_KEY"] = "bench-key"
+    os.environ["GEMINI_BASE_URL"] = fake.url
+
+    try:
+        os.chdir(workspace)
+        with open("tempfile.txt", 'w') as f:
+            json.dump(corpus.make_profiles(args.profiles), f, indent=2)
+
+        import main as api
+        result = asyncio.run(run_load(api.app, args.chats, args.probe_seconds, args.interval_ms / 1000))
+    finally:
+        os.chdir(previous_cwd)
+        fake.stop()
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    result["params"] = vars(args)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+
+    p99 = result["health_under_load"]["p99_ms"]
+    if p99 > args.max_p99_ms:
+        print(f"FAIL: health check p99 {p99:.1f}ms under load exceeds {args.max_p99_ms:.1f}ms")
+        sys.exit(1)
+    print(f"OK: health check p99 {p99:.1f}ms under load (idle {result['health_idle']['p99_ms']:.1f}ms)")
+
+if __name__ == "__main__":
+    main()
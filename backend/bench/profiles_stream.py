@@ -0,0 +1,152 @@
+"""
+Memory and latency of /profiles: buffered JSON versus streamed NDJSON.
+
+Drives the ASGI app directly and drops each body chunk as it arrives, so the
+numbers show what the server holds per request rather than what a test client
+buffers. "reencode" is the original handler (json.loads plus FastAPI's
+jsonable_encoder), kept as a reference point.
+
+    cd backend
+    python -m bench.profiles_stream --profiles 1000 10000
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from bench import corpus
+from bench.run import latency_summary, peak_memory
+
+MODES = {
+    "buffered": ("/profiles", []),
+    "ndjson": ("/profiles?format=ndjson", []),
+    "ndjson_fields": ("/profiles?format=ndjson&fields=name,headline", []),
+    "json_fields": ("/profiles?fields=name,headline", []),
+    "ndjson_accept": ("/profiles", [(b"accept", b"application/x-ndjson")]),
+}
+
+async def fetch(app, url: str, headers: list) -> dict:
+    """Send one GET through the app and return status, body size and time to first byte."""
+    parts = urlsplit(url)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench")] + headers,
+        "client": ("bench", 0),
+        "server": ("bench", 80),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client never disconnects; the server cancels this once the response is done
+        await asyncio.Event().wait()
+
+    result = {"status": None, "bytes": 0, "ttfb": None}
+    start = time.perf_counter()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if result["ttfb"] is None:
+                result["ttfb"] = time.perf_counter() - start
+            result["bytes"] += len(message["body"])
+
+    await app(scope, receive, send)
+    return result
+
+def reencode_profiles(app) -> dict:
+    """The original /profiles handler: parse the file and re-encode every profile."""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    start = time.perf_counter()
+    with open("tempfile.txt", 'r') as f:
+        content = f.read()
+    body = JSONResponse(content=jsonable_encoder(json.loads(content))).body
+    return {"status": 200, "bytes": len(body), "ttfb": time.perf_counter() - start}
+
+def bench_mode(app, mode: str, iterations: int) -> dict:
+    if mode == "reencode":
+        request = lambda: reencode_profiles(app)
+    else:
+        url, headers = MODES[mode]
+        request = lambda: asyncio.run(fetch(app, url, headers))
+
+    first = request()
+    assert first["status"] == 200, f"{mode} returned {first['status']}"
+
+    samples, ttfbs = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = request()
+        samples.append(time.perf_counter() - start)
+        ttfbs.append(result["ttfb"])
+
+    return {
+        "mode": mode,
+        "bytes": first["bytes"],
+        "latency": latency_summary(samples),
+        "ttfb": latency_summary(ttfbs),
+        "peak_memory_bytes": peak_memory(request),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare /profiles response modes for memory and latency.")
+    parser.add_argument("--profiles", type=int, nargs="+", default=[1000, 10000], help="Store sizes to test")
+    parser.add_argument("--iterations", type=int, default=10, help="Timed requests per mode")
+    parser.add_argument("--modes", nargs="+", default=["reencode"] + list(MODES), choices=["reencode"] + list(MODES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    workspace = Path(tempfile.mkdtemp(prefix="asb-stream-"))
+    previous_cwd = os.getcwd()
+    results = []
+    try:
+        os.chdir(workspace)
+        import main as api
+
+        for size in args.profiles:
+            with open("tempfile.txt", 'w') as f:
+                json.dump(corpus.make_profiles(size, seed=args.seed), f, indent=2)
+            file_size = os.path.getsize("tempfile.txt")
+
+            for mode in args.modes:
+                record = bench_mode(api.app, mode, args.iterations)
+                record.update(profiles=size, file_bytes=file_size)
+                results.append(record)
+                print(f"{size:>7} {mode:<14} p50 {record['latency']['p50_ms']:8.1f}ms  "
+                      f"ttfb {record['ttfb']['p50_ms']:7.1f}ms  peak {record['peak_memory_bytes'] / 2**20:7.1f}MiB")
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    output = {"params": vars(args), "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(output, indent=2))
+    else:
+        print(json.dumps(output, indent=2))
+
+if __name__ == "__main__":
+    main()
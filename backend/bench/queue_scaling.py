@@ -0,0 +1,226 @@
+"""
+Multi-process scaling test for the shared work queue.
+
+Queues N extract jobs and drains them with 1, 2, 4, ... worker processes
+against a fake Gemini server, checking that every URL is extracted exactly
+once (one Gemini call and one claim per job) and that throughput scales close
+to linearly with the worker count. A crash scenario leaves
+leased jobs behind in a killed process and checks they are recovered once
+the lease expires.
+
+    cd backend
+    python -m bench.queue_scaling --jobs 64 --workers 1,2,4,8
+
+When a worker count falls short of the efficiency minimum, the output says
+whether the run was CPU-bound (workers and the fake server share the
+machine's cores) or spent its time waiting on the store lock held by
+upsert_profile.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CPU_COUNT = os.cpu_count() or 1
+sys.path.insert(0, str(BACKEND_DIR))
+
+from bench import corpus
+from bench.fake_gemini import FakeGemini
+
+def _worker(workspace: str, gemini_url: str, barrier) -> None:
+    os.chdir(workspace)
+    os.environ["GEMINI_API_KEY"] = "bench-key"
+    os.environ["GEMINI_BASE_URL"] = gemini_url
+    sys.stdout = open(os.devnull, 'w')
+
+    from coordination import WorkQueue
+    from worker import run_worker
+    import llm
+
+    # Interpreter start-up and imports are paid once per process, not per job; keep them out of the timing
+    llm.get_gemini_client("bench-key")
+    import metrics
+    barrier.wait()
+    cpu_start = time.process_time()
+    run_worker(["extract"], WorkQueue(), poll_interval=0.05, exit_when_idle=True)
+    stats = {
+        "finished_at": time.time(),
+        "cpu_s": time.process_time() - cpu_start,
+        "lock_wait_s": metrics.histogram_sum("lock_wait_seconds", file="tempfile.txt"),
+        "queue_wait_s": metrics.histogram_sum("lock_wait_seconds", file="queue.db"),
+    }
+    Path(workspace, f"worker-stats-{os.getpid()}.json").write_text(json.dumps(stats))
+
+def _crashing_worker(workspace: str, jobs: int, lease_seconds: float) -> None:
+    """Claim jobs and die without completing them, like a worker killed mid-batch."""
+    os.chdir(workspace)
+    from coordination import WorkQueue, worker_id
+    WorkQueue().claim(worker_id("crashed"), "extract", jobs, lease_seconds)
+    os._exit(1)
+
+def prepare(workspace: Path, jobs: int) -> list[str]:
+    """Reset the store and queue and queue one extract job per profile."""
+    from coordination import QUEUE_PATH, WorkQueue
+    for path in ["tempfile.txt", "analytics.json"]:
+        (workspace / path).unlink(missing_ok=True)
+    shutil.rmtree(workspace / os.path.dirname(QUEUE_PATH), ignore_errors=True)
+
+    urls = [corpus.profile_url(index) for index in range(jobs)]
+    WorkQueue(str(workspace / QUEUE_PATH)).enqueue(urls, "extract")
+    return urls
+
+def check(workspace: Path, urls: list[str], llm_calls: int) -> dict:
+    """
+    Verify every URL was stored and no job was worked on twice.
+
+    The store dedupes by URL, so duplicate work shows up only in the Gemini
+    call count and in the number of times each job was claimed.
+    """
+    from coordination import QUEUE_PATH, WorkQueue
+    profiles = json.loads((workspace / "tempfile.txt").read_text())
+    stored = {profile["linkedinUrl"] for profile in profiles}
+    with sqlite3.connect(workspace / QUEUE_PATH) as conn:
+        reclaimed = conn.execute("SELECT COUNT(*) FROM jobs WHERE stage = 'extract' AND attempts > 1").fetchone()[0]
+    return {
+        "stored": len(stored),
+        "missing": len(set(urls) - stored),
+        "llm_calls": llm_calls,
+        "duplicate_llm_calls": llm_calls - len(urls),
+        "reclaimed_jobs": reclaimed,
+        "queue": WorkQueue(str(workspace / QUEUE_PATH)).stats(),
+    }
+
+def run_workers(workspace: Path, fake: FakeGemini, count: int) -> dict:
+    """
+    Start count workers, release them together once all are ready and time the drain.
+
+    Wall time runs until the last worker finished its last job, so interpreter
+    shutdown of the worker processes, which grows with their count, is not
+    counted. Also returns CPU utilisation of the workers and this process
+    (which runs the fake server) and the share of time spent waiting on the
+    store lock and on the queue's write lock.
+    """
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(count + 1)
+    processes = [context.Process(target=_worker, args=(str(workspace), fake.url, barrier)) for _ in range(count)]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    start = time.time()
+    cpu_start = time.process_time()
+    for process in processes:
+        process.join()
+
+    cpu, lock_wait, queue_wait, finished_at = time.process_time() - cpu_start, 0.0, 0.0, start
+    for path in workspace.glob("worker-stats-*.json"):
+        stats = json.loads(path.read_text())
+        finished_at = max(finished_at, stats["finished_at"])
+        cpu += stats["cpu_s"]
+        lock_wait += stats["lock_wait_s"]
+        queue_wait += stats["queue_wait_s"]
+        path.unlink()
+    wall = finished_at - start
+    return {
+        "wall_s": wall,
+        "cpu_utilisation": cpu / (wall * CPU_COUNT),
+        "lock_wait_share": lock_wait / (wall * count),
+        "queue_wait_share": queue_wait / (wall * count),
+    }
+
+def diagnose(record: dict) -> str:
+    """Name the likely reason a worker count scaled poorly."""
+    if record["cpu_utilisation"] > 0.5:
+        return f"CPU-bound: {record['cpu_utilisation']:.0%} of {CPU_COUNT} CPU(s) busy"
+    if record["lock_wait_share"] > 0.2:
+        return f"store lock contention: workers spent {record['lock_wait_share']:.0%} of their time waiting on upsert_profile's lock"
+    if record["queue_wait_share"] > 0.2:
+        return f"queue contention: workers spent {record['queue_wait_share']:.0%} of their time waiting on the queue's write lock"
+    return (f"neither CPU ({record['cpu_utilisation']:.0%} busy) nor the store or queue locks "
+            f"({record['lock_wait_share']:.0%} / {record['queue_wait_share']:.0%} waiting) look saturated; "
+            f"try more jobs per worker")
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput scaling of queue workers across processes.")
+    parser.add_argument("--jobs", type=int, default=64, help="Extract jobs to queue")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker process counts")
+    parser.add_argument("--llm-latency-ms", type=float, default=1000, help="Latency of the fake Gemini server")
+    parser.add_argument("--crash-jobs", type=int, default=10, help="Jobs left leased by a crashed worker")
+    parser.add_argument("--lease-seconds", type=float, default=1, help="Lease length in the crash scenario")
+    # About 0.95 is expected at 4 workers on one CPU; the default leaves margin for a noisy machine.
+    # More workers than the default fit on one CPU only with enough LLM latency to overlap
+    parser.add_argument("--min-efficiency", type=float, default=0.6,
+                        help="Fail if throughput per worker drops below this fraction of the single-worker rate")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    workspace = Path(tempfile.mkdtemp(prefix="asb-queue-"))
+    corpus.write_chopped_corpus(workspace / "data/chopped/data", args.jobs)
+    fake = FakeGemini(args.llm_latency_ms).start()
+
+    results = {"params": vars(args), "cpu_count": CPU_COUNT, "scaling": [], "crash_recovery": None}
+    try:
+        baseline = None
+        for count in [int(count) for count in args.workers.split(",")]:
+            urls = prepare(workspace, args.jobs)
+            requests_before = fake.requests
+            timing = run_workers(workspace, fake, count)
+            wall = timing["wall_s"]
+            throughput = args.jobs / wall
+            baseline = baseline or throughput / count
+            record = {
+                "workers": count,
+                **timing,
+                "jobs_per_s": throughput,
+                "efficiency": throughput / (baseline * count),
+                **check(workspace, urls, fake.requests - requests_before),
+            }
+            results["scaling"].append(record)
+            print(f"{count} workers: {throughput:.1f} jobs/s, efficiency {record['efficiency']:.2f}, "
+                  f"duplicate calls {record['duplicate_llm_calls']}, reclaimed {record['reclaimed_jobs']}, "
+                  f"missing {record['missing']}, CPU {record['cpu_utilisation']:.0%}, "
+                  f"lock wait {record['lock_wait_share']:.0%}, queue wait {record['queue_wait_share']:.0%}")
+
+        urls = prepare(workspace, args.jobs)
+        context = multiprocessing.get_context("spawn")
+        crashed = context.Process(target=_crashing_worker, args=(str(workspace), args.crash_jobs, args.lease_seconds))
+        crashed.start()
+        crashed.join()
+        time.sleep(args.lease_seconds)
+        requests_before = fake.requests
+        run_workers(workspace, fake, 2)
+        results["crash_recovery"] = check(workspace, urls, fake.requests - requests_before)
+        print(f"Crash recovery: {json.dumps(results['crash_recovery'])}")
+    finally:
+        fake.stop()
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    failures = []
+    for record in results["scaling"]:
+        if record["missing"] or record["duplicate_llm_calls"] or record["reclaimed_jobs"]:
+            failures.append(f"{record['workers']} workers lost or repeated work")
+        if record["efficiency"] < args.min_efficiency:
+            failures.append(f"{record['workers']} workers ran at {record['efficiency']:.2f} efficiency, "
+                            f"minimum {args.min_efficiency:.2f} ({diagnose(record)})")
+    # Jobs abandoned by the crashed worker are claimed twice by design, but must reach Gemini once
+    crash = results["crash_recovery"]
+    if crash["missing"] or crash["duplicate_llm_calls"]:
+        failures.append("crash recovery lost or repeated work")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("OK: every job extracted once, scaling within the efficiency minimum")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+End-to-end benchmark suite for the backend.
+
+Builds a synthetic corpus in a scratch workspace, starts a fake Gemini server
+and measures chop throughput, extraction throughput, store read/write cost and
+/profiles and /chat latency percentiles at several store sizes. Results are
+written as JSON so two runs can be compared:
+
+    cd backend
+    python -m bench.run --output bench_results.json
+    python -m bench.run --output new.json --baseline bench_results.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from pathlib import Path
+from datetime import datetime, timezone
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from bench import corpus
+from bench.fake_gemini import FakeGemini
+
+# Pages cleaned per size preset; large pages are ~1.3MB like real saved profiles
+CHOP_PAGES = {"small": 20, "medium": 8, "large": 4}
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+def latency_summary(samples: list) -> dict:
+    """Summarize latencies (seconds) as milliseconds."""
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+def timed_runs(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def peak_memory(fn) -> int:
+    """Run fn once under tracemalloc and return the peak bytes allocated."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench_chop(workspace: Path, seed: int) -> list:
+    from chop import clean_html
+
+    records = []
+    for size, count in CHOP_PAGES.items():
+        pages = [path.read_text(encoding="utf-8") for path in corpus.write_html_corpus(workspace / "html" / size, count, size, seed)]
+        total_bytes = sum(len(page.encode("utf-8")) for page in pages)
+
+        samples = []
+        for page in pages:
+            start = time.perf_counter()
+            clean_html(page)
+            samples.append(time.perf_counter() - start)
+
+        elapsed = sum(samples)
+        records.append({
+            "name": "chop.clean_html",
+            "params": {"size": size},
+            "pages": count,
+            "page_bytes": total_bytes // count,
+            "pages_per_s": count / elapsed,
+            "mb_per_s": total_bytes / elapsed / 1e6,
+            **latency_summary(samples),
+            "peak_bytes": peak_memory(lambda: clean_html(pages[0])),
+        })
+    return records
+
+def bench_extraction(scale: int, lookups: int, extract_count: int, seed: int) -> list:
+    import llm
+
+    chopped_dir = Path("data/chopped/data")
+    shutil.rmtree(chopped_dir, ignore_errors=True)
+    corpus.write_chopped_corpus(chopped_dir, scale, "small", seed)
+
+    step = max(1, scale // lookups)
+    names = [corpus.profile_slug(index) for index in range(0, scale, step)][:lookups]
+    lookup_samples = timed_runs(lambda: [llm.get_data_from_file(name) for name in names], 1)[0] / len(names)
+
+    urls = [corpus.profile_url(index) for index in range(0, scale, step)][:extract_count]
+    failures = 0
+    samples = []
+    for url in urls:
+        start = time.perf_counter()
+        try:
+            json.loads(llm.process_linkedin_url(url, os.environ["GEMINI_API_KEY"])["gemini_response"])
+        except Exception:
+            failures += 1
+        samples.append(time.perf_counter() - start)
+
+    return [
+        {
+            "name": "llm.get_data_from_file",
+            "params": {"profiles": scale},
+            "lookups": len(names),
+            "mean_ms": lookup_samples * 1000,
+        },
+        {
+            "name": "llm.process_linkedin_url",
+            "params": {"profiles": scale},
+            "profiles_per_s": len(urls) / sum(samples),
+            "failures": failures,
+            **latency_summary(samples),
+        },
+    ]
+
+def bench_store(profiles: list) -> dict:
+    path = "tempfile.txt"
+
+    def write():
+        with open(path, 'w') as f:
+            json.dump(profiles, f, indent=2)
+
+    def read():
+        with open(path, 'r') as f:
+            json.load(f)
+
+    iterations = max(3, 3000 // len(profiles))
+    write_samples = timed_runs(write, iterations)
+    read_samples = timed_runs(read, iterations)
+    return {
+        "name": "store.tempfile",
+        "params": {"profiles": len(profiles)},
+        "file_bytes": os.path.getsize(path),
+        "write_p50_ms": percentile(write_samples, 50) * 1000,
+        "read_p50_ms": percentile(read_samples, 50) * 1000,
+        "read_peak_bytes": peak_memory(read),
+    }
+
+def bench_endpoints(client, scale: int, chat_iterations: int) -> list:
+    profile_iterations = max(5, 5000 // scale)
+
+    def get_profiles():
+        response = client.get("/profiles")
+        assert response.status_code == 200, response.text
+
+    def post_chat():
+        response = client.post("/chat", json={"query": "Who has worked at Microsoft?"})
+        assert response.status_code == 200, response.text
+
+    get_profiles()
+    profile_samples = timed_runs(get_profiles, profile_iterations)
+    chat_samples = timed_runs(post_chat, chat_iterations)
+    return [
+        {"name": "api.profiles", "params": {"profiles": scale}, **latency_summary(profile_samples), "peak_bytes": peak_memory(get_profiles)},
+        {"name": "api.chat", "params": {"profiles": scale}, **latency_summary(chat_samples), "peak_bytes": peak_memory(post_chat)},
+    ]
+
+def record_key(record: dict) -> str:
+    params = ",".join(f"{key}={value}" for key, value in sorted(record["params"].items()))
+    return f"{record['name']}[{params}]"
+
+def compare(results: dict, baseline: dict) -> None:
+    """Print the ratio of every shared numeric metric against a baseline run."""
+    previous = {record_key(record): record for record in baseline["results"]}
+    for record in results["results"]:
+        old = previous.get(record_key(record))
+        if not old:
+            continue
+        for metric, value in record.items():
+            if metric in ("name", "params") or not isinstance(value, (int, float)) or not old.get(metric):
+                continue
+            print(f"{record_key(record):45} {metric:16} {old[metric]:12.2f} -> {value:12.2f} ({value / old[metric]:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend benchmark suite.")
+    parser.add_argument("--scales", default="100,1000,10000", help="Comma-separated profile counts")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Latency of the fake Gemini server")
+    parser.add_argument("--llm-error-rate", type=float, default=0, help="Error rate of the fake Gemini server")
+    parser.add_argument("--lookups", type=int, default=50, help="get_data_from_file lookups per scale")
+    parser.add_argument("--extract-count", type=int, default=50, help="process_linkedin_url calls per scale")
+    parser.add_argument("--chat-iterations", type=int, default=10, help="/chat requests per scale")
+    parser.add_argument("--skip-chop", action="store_true", help="Skip the HTML cleaning benchmark")
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(",")]
+    output = Path(args.output).resolve()
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+
+    workspace = Path(tempfile.mkdtemp(prefix="asb-bench-"))
+    previous_cwd = os.getcwd()
+    fake = FakeGemini(args.llm_latency_ms, error_rate=args.llm_error_rate, seed=args.seed).start()
+    os.environ["GEMINI_API_KEY"] = "bench-key"
+    os.environ["GEMINI_BASE_URL"] = fake.url
+
+    records = []
+    try:
+        # The backend resolves data/ and tempfile.txt relative to the working directory
+        os.chdir(workspace)
+
+        if not args.skip_chop:
+            records += bench_chop(workspace, args.seed)
+            print("chop done")
+
+        from fastapi.testclient import TestClient
+        import main as api
+        client = TestClient(api.app)
+
+        for scale in scales:
+            profiles = corpus.make_profiles(scale, "small", args.seed)
+            records += bench_extraction(scale, args.lookups, args.extract_count, args.seed)
+            records.append(bench_store(profiles))
+            records += bench_endpoints(client, scale, args.chat_iterations)
+            print(f"{scale} profiles done")
+    finally:
+        os.chdir(previous_cwd)
+        fake.stop()
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scales": scales,
+            "seed": args.seed,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_error_rate": args.llm_error_rate,
+            "fake_gemini_requests": fake.requests,
+        },
+        "results": records,
+    }
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Wrote {len(records)} results to {output}")
+
+    if baseline:
+        compare(results, baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Cold-start import time and memory of the API, with a startup budget check.
+
+Each measurement runs in a fresh interpreter: import a module, then report
+wall time, peak RSS and which heavy subsystems ended up loaded. For main the
+child also serves one GET / and one GET /profiles through the ASGI app, so
+the number covers everything needed before read-only requests are answered.
+
+    cd backend
+    python -m bench.startup --max-import-ms 1000 --max-rss-mib 64
+
+Exits non-zero if the API goes over budget or loads the scraper or the
+Gemini SDK at import time.
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Subsystems read-only serving must not pay for
+HEAVY_MODULES = ["google.genai", "selenium", "bs4", "schedule", "pyarrow", "pandas"]
+
+CHILD = """
+import sys, json, time, resource
+start = time.perf_counter()
+import {module}
+import_seconds = time.perf_counter() - start
+
+first_request_seconds = None
+if {serve}:
+    import asyncio
+
+    async def get(path):
+        scope = {{"type": "http", "asgi": {{"version": "3.0"}}, "http_version": "1.1", "method": "GET",
+                  "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+                  "root_path": "", "headers": [(b"host", b"bench")], "client": ("bench", 0), "server": ("bench", 80)}}
+        messages = [{{"type": "http.request", "body": b"", "more_body": False}}]
+        status = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        await {module}.app(scope, receive, send)
+        assert status == [200], (path, status)
+
+    asyncio.run(get("/"))
+    asyncio.run(get("/profiles"))
+    first_request_seconds = time.perf_counter() - start
+
+# ru_maxrss is in KiB on Linux
+print(json.dumps({{
+    "import_s": import_seconds,
+    "first_request_s": first_request_seconds,
+    "rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+def measure(module: str, workspace: Path, serve: bool = False) -> dict:
+    """Import module in a fresh interpreter, with the workspace as working directory."""
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR), PYTHONDONTWRITEBYTECODE="1")
+    code = CHILD.format(module=module, serve=serve, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], cwd=workspace, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(module: str, runs: list) -> dict:
+    first_requests = [run["first_request_s"] for run in runs if run["first_request_s"] is not None]
+    return {
+        "module": module,
+        "runs": len(runs),
+        "import_ms": statistics.median(run["import_s"] for run in runs) * 1000,
+        "first_request_ms": statistics.median(first_requests) * 1000 if first_requests else None,
+        "rss_mib": statistics.median(run["rss_bytes"] for run in runs) / 2**20,
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API cold-start import time and RSS against a budget.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--modules", nargs="*", default=["llm", "scheduler"],
+                        help="Other modules to measure for reference")
+    parser.add_argument("--max-import-ms", type=float, default=1000, help="Budget for importing main")
+    parser.add_argument("--max-rss-mib", type=float, default=64, help="Budget for peak RSS after the first requests")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    workspace = Path(tempfile.mkdtemp(prefix="asb-startup-"))
+    try:
+        (workspace / "tempfile.txt").write_text("[]")
+        # One untimed import so every run sees a warm page cache
+        measure("main", workspace)
+        api = summarize("main", [measure("main", workspace, serve=True) for _ in range(args.runs)])
+        references = [summarize(module, [measure(module, workspace) for _ in range(args.runs)]) for module in args.modules]
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    result = {"params": vars(args), "api": api, "reference": references}
+    print(json.dumps(result, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+
+    failures = []
+    if api["import_ms"] > args.max_import_ms:
+        failures.append(f"importing main took {api['import_ms']:.0f}ms, budget {args.max_import_ms:.0f}ms")
+    if api["rss_mib"] > args.max_rss_mib:
+        failures.append(f"RSS after first requests is {api['rss_mib']:.1f}MiB, budget {args.max_rss_mib:.0f}MiB")
+    if api["heavy_modules"]:
+        failures.append(f"main loads {', '.join(api['heavy_modules'])} at startup")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print(f"OK: main imports in {api['import_ms']:.0f}ms, serves its first requests after "
+          f"{api['first_request_ms']:.0f}ms at {api['rss_mib']:.1f}MiB RSS")
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import logging
 import shutil
 import re
 from typing import Union
+import metrics
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -16,6 +17,14 @@ def clean_html(html_content: str) -> str:
     Also handles JSON blocks and improves text cleaning.
     Returns plain text content.
     """
+    with metrics.stage("clean_html") as span:
+        span.add_bytes(len(html_content), "in")
+        text = _clean_html(html_content)
+        span.add_bytes(len(text), "out")
+    return text
+
+def _clean_html(html_content: str) -> str:
+    """Untimed implementation of clean_html."""
     soup = BeautifulSoup(html_content, 'html.parser')
     
     # Remove script and style elements
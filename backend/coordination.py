@@ -0,0 +1,222 @@
+import os
+import time
+import fcntl
+import socket
+import sqlite3
+from contextlib import contextmanager
+from typing import Optional
+import metrics
+
+# Kept out of the root of data/, which the scraper used to wipe between runs
+QUEUE_PATH = os.path.join("data/queue", "queue.db")
+
+# A lease that is not completed or renewed within this many seconds is handed to another worker
+DEFAULT_LEASE_SECONDS = 600
+MAX_ATTEMPTS = 3
+
+@contextmanager
+def file_lock(path: str, shared: bool = False):
+    """
+    Hold an advisory lock on path for the duration of the block.
+
+    The lock lives on a sibling "<path>.lock" file so the data file itself can be
+    replaced atomically while locked. Works across processes on the same host.
+    """
+    lock_path = f"{path}.lock"
+    directory = os.path.dirname(lock_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(lock_path, 'a') as lock_file:
+        started_at = time.perf_counter()
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        metrics.observe("lock_wait_seconds", time.perf_counter() - started_at, file=os.path.basename(path))
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def worker_id(prefix: str = "worker") -> str:
+    """Return an id that is unique per process, including the host name for log readability."""
+    return f"{prefix}-{socket.gethostname()}-{os.getpid()}"
+
+class WorkQueue:
+    """
+    SQLite-backed work queue with leases, shared by API and worker processes.
+
+    Each job is a (stage, url) pair. claim() hands out pending jobs, or jobs whose
+    lease expired because their worker crashed, inside a single write
+    transaction, so two processes never hold the same job at once.
+
+    All processes must run on one host with data/ on a local filesystem: the
+    queue uses SQLite's WAL mode, which does not work over network filesystems
+    such as NFS, where flock-based file_lock is unreliable as well.
+
+    Args:
+        path: SQLite database file; every process must use the same one
+        max_attempts: Claims after which a failing job is marked failed
+    """
+
+    def __init__(self, path: str = QUEUE_PATH, max_attempts: int = MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    stage TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (stage, url)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (stage, status, updated_at)")
+
+    @contextmanager
+    def _connect(self):
+        # isolation_level=None so transactions are opened explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Open a write transaction up front so concurrent claims serialize instead of deadlocking."""
+        with self._connect() as conn:
+            started_at = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            metrics.observe("lock_wait_seconds", time.perf_counter() - started_at, file=os.path.basename(self.path))
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(self, urls: list[str], stage: str, requeue: bool = False) -> int:
+        """
+        Add jobs for urls, skipping ones already queued.
+
+        Args:
+            urls: URLs to queue
+            stage: Pipeline stage, e.g. "scrape" or "extract"
+            requeue: Also reset finished or failed jobs to pending (leased ones are left alone)
+
+        Returns:
+            int: Number of jobs that became pending
+        """
+        now = time.time()
+        added = 0
+        with self._transaction() as conn:
+            for url in urls:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO jobs (stage, url, updated_at) VALUES (?, ?, ?)",
+                    (stage, url, now),
+                )
+                if cursor.rowcount == 0 and requeue:
+                    cursor = conn.execute(
+                        "UPDATE jobs SET status = 'pending', attempts = 0, last_error = NULL, updated_at = ? "
+                        "WHERE stage = ? AND url = ? AND status IN ('done', 'failed')",
+                        (now, stage, url),
+                    )
+                added += cursor.rowcount
+        return added
+
+    def claim(self, owner: str, stage: str, limit: int = 1, lease_seconds: float = DEFAULT_LEASE_SECONDS, urls: Optional[list[str]] = None) -> list[str]:
+        """
+        Lease up to limit jobs of a stage to owner.
+
+        Pending jobs and jobs whose lease has expired are eligible. Pass urls to
+        claim only those specific jobs, e.g. the ones an API request just queued.
+
+        Returns:
+            list: URLs now leased to owner
+        """
+        now = time.time()
+        query = (
+            "SELECT url FROM jobs WHERE stage = ? AND attempts < ? "
+            "AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+        )
+        params = [stage, self.max_attempts, now]
+        if urls is not None:
+            query += f" AND url IN ({','.join('?' * len(urls))})"
+            params += urls
+        query += " ORDER BY updated_at LIMIT ?"
+        params.append(limit)
+
+        with self._transaction() as conn:
+            # Jobs whose worker died on their last attempt will never be claimed again
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', owner = NULL, last_error = 'lease expired', updated_at = ? "
+                "WHERE stage = ? AND status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, stage, now, self.max_attempts),
+            )
+            claimed = [row[0] for row in conn.execute(query, params)]
+            conn.executemany(
+                "UPDATE jobs SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE stage = ? AND url = ?",
+                [(owner, now + lease_seconds, now, stage, url) for url in claimed],
+            )
+        return claimed
+
+    def renew(self, owner: str, stage: str, url: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend a lease for long-running work; False means the lease was lost."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE stage = ? AND url = ? AND owner = ? AND status = 'leased'",
+                (time.time() + lease_seconds, stage, url, owner),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, owner: str, stage: str, url: str, next_stage: Optional[str] = None) -> bool:
+        """
+        Mark a leased job done and optionally queue the url for the next stage.
+
+        Returns False, and changes nothing, if owner no longer holds the lease
+        (it expired and another worker claimed the job).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', owner = NULL, lease_expires = NULL, last_error = NULL, updated_at = ? "
+                "WHERE stage = ? AND url = ? AND owner = ? AND status = 'leased'",
+                (now, stage, url, owner),
+            )
+            if cursor.rowcount == 1 and next_stage:
+                conn.execute(
+                    "INSERT INTO jobs (stage, url, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (stage, url) DO UPDATE SET status = 'pending', attempts = 0, last_error = NULL, updated_at = excluded.updated_at "
+                    "WHERE jobs.status != 'leased'",
+                    (next_stage, url, now),
+                )
+        return cursor.rowcount == 1
+
+    def fail(self, owner: str, stage: str, url: str, error: str) -> None:
+        """Return a leased job to the queue, or mark it failed once it is out of attempts."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? "
+                "WHERE stage = ? AND url = ? AND owner = ? AND status = 'leased'",
+                (self.max_attempts, error, time.time(), stage, url, owner),
+            )
+
+    def stats(self) -> dict:
+        """Return job counts per stage and status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT stage, status, COUNT(*) FROM jobs GROUP BY stage, status").fetchall()
+        stats = {}
+        for stage, status, count in rows:
+            stats.setdefault(stage, {})[status] = count
+        return stats
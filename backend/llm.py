@@ -1,10 +1,33 @@
 import os
 import re
 import json
+import functools
 from pathlib import Path
 from google import genai
 from google.genai import types
-from typing import Optional
+from typing import Optional, Union
+import metrics
+
+def get_gemini_client(gemini_api_key: str) -> genai.Client:
+    """
+    Return a Gemini client. GEMINI_BASE_URL points it at a different endpoint,
+    e.g. the fake server used by the benchmarks.
+    """
+    return _create_gemini_client(gemini_api_key, os.getenv("GEMINI_BASE_URL"))
+
+@functools.lru_cache(maxsize=8)
+def _create_gemini_client(gemini_api_key: str, base_url: Optional[str]) -> genai.Client:
+    # Building a client costs ~100ms of CPU, so clients are shared across calls and threads
+    if base_url:
+        return genai.Client(api_key=gemini_api_key, http_options=types.HttpOptions(base_url=base_url))
+    return genai.Client(api_key=gemini_api_key)
+
+def record_usage(span, response) -> None:
+    """Attach Gemini token usage from a response to a metrics span."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        span.add_tokens(usage.prompt_token_count, "prompt")
+        span.add_tokens(usage.candidates_token_count, "output")
 
 def extract_name_from_linkedin(url: str) -> Optional[str]:
     """
@@ -17,18 +40,17 @@ def extract_name_from_linkedin(url: str) -> Optional[str]:
 
 def get_data_from_file(name: str) -> Optional[str]:
     """
-    Get data from a text file that contains the name.
+    Get data from the newest text file that contains the name.
     """
     data_dir = Path("data/chopped/data")
     if not data_dir.exists():
         raise FileNotFoundError("Data directory not found")
     
-    # Search for files containing the name
-    for file_path in data_dir.glob("*.txt"):
-        if name.lower() in file_path.stem.lower():
-            return file_path.read_text()
-    
-    return None
+    # Search for files containing the name; a profile scraped again gets a newer file
+    matches = [file_path for file_path in data_dir.glob("*.txt") if name.lower() in file_path.stem.lower()]
+    if not matches:
+        return None
+    return max(matches, key=lambda file_path: file_path.stat().st_mtime_ns).read_text()
 
 def clean_gemini_response(response_text: str) -> str:
     """
@@ -52,6 +74,43 @@ def clean_gemini_response(response_text: str) -> str:
     
     return response_text
 
+def parse_gemini_profile(url: str, gemini_response: str) -> dict:
+    """
+    Parse the profile JSON returned by process_linkedin_url.
+
+    Args:
+        url: LinkedIn profile URL the response belongs to
+        gemini_response: The "gemini_response" text
+
+    Returns:
+        dict: Profile data with linkedinUrl set, or a dict with an "error" key if parsing failed
+    """
+    try:
+        # Additional cleaning in case clean_gemini_response didn't catch everything
+        cleaned = gemini_response
+        if cleaned.startswith('```') and cleaned.endswith('```'):
+            cleaned = cleaned.strip('```').strip()
+            if cleaned.startswith('json'):
+                cleaned = cleaned[4:].strip()
+        
+        parsed_data = json.loads(cleaned)
+        
+        # Validate that we got a valid structure
+        if not isinstance(parsed_data, dict):
+            raise ValueError("Response is not a valid JSON object")
+        parsed_data["linkedinUrl"] = url
+        return parsed_data
+    
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"JSON parsing failed for {url}: {e}")
+        print(f"Raw response: {gemini_response}")
+        return {
+            "error": "Failed to parse JSON response",
+            "raw_response": gemini_response,
+            "parse_error": str(e)
+        }
+
+@metrics.timed("process_linkedin_url")
 def process_linkedin_url(url: str, gemini_api_key: str) -> dict:
     """
     Process LinkedIn URL, get corresponding data, and call Gemini API.
@@ -69,7 +128,9 @@ def process_linkedin_url(url: str, gemini_api_key: str) -> dict:
         raise ValueError("Invalid LinkedIn URL")
     
     # Get data from file
-    data = get_data_from_file(name)
+    with metrics.stage("read_chopped") as span:
+        data = get_data_from_file(name)
+        span.add_bytes(len(data or ""), "in")
     if not data:
         raise ValueError(f"No data found for {name}")
     
@@ -171,10 +232,12 @@ Data:
 """
     
     # Configure Gemini API
-    client = genai.Client(api_key=gemini_api_key)
-    response = client.models.generate_content(
-    model='gemini-2.0-flash-001', contents=prompt
-    )
+    client = get_gemini_client(gemini_api_key)
+    with metrics.stage("gemini_generate", call="extract") as span:
+        response = client.models.generate_content(
+        model='gemini-2.0-flash-001', contents=prompt
+        )
+        record_usage(span, response)
     
     # Clean the response
     cleaned_response = clean_gemini_response(response.text)
@@ -183,13 +246,14 @@ Data:
         "gemini_response": cleaned_response
     }
 
-def query_alumni_data(query: str, alumni_data: list, gemini_api_key: str) -> dict:
+@metrics.timed("query_alumni_data")
+def query_alumni_data(query: str, alumni_data: Union[list, str], gemini_api_key: str) -> dict:
     """
     Query alumni data using Gemini API based on user question.
     
     Args:
         query: User's question about the alumni
-        alumni_data: List of alumni profile data from tempfile.txt
+        alumni_data: List of alumni profile data from tempfile.txt, or its JSON text
         gemini_api_key: Gemini API key
     
     Returns:
@@ -197,7 +261,7 @@ def query_alumni_data(query: str, alumni_data: list, gemini_api_key: str) -> dic
     """
     
     # Convert alumni data to a formatted string for context
-    context = json.dumps(alumni_data, indent=2)
+    context = alumni_data if isinstance(alumni_data, str) else json.dumps(alumni_data, indent=2)
     
     prompt = f"""
 You are a helpful assistant that can answer questions about alumni profiles. You have access to a database of LinkedIn profiles with detailed information about various alumni.
@@ -213,11 +277,13 @@ Please provide a helpful, accurate, and well-structured response. If you're list
 """
     
     # Configure Gemini API
-    client = genai.Client(api_key=gemini_api_key)
-    response = client.models.generate_content(
-        model='gemini-2.0-flash-001', 
-        contents=prompt
-    )
+    client = get_gemini_client(gemini_api_key)
+    with metrics.stage("gemini_generate", call="chat") as span:
+        response = client.models.generate_content(
+            model='gemini-2.0-flash-001', 
+            contents=prompt
+        )
+        record_usage(span, response)
     
     return {
         "query": query,
@@ -1,17 +1,33 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 import os
-from llm import process_linkedin_url, query_alumni_data
+import asyncio
 import json
 from dotenv import load_dotenv
-from scheduler import scrape_a_few_profiles
+import analytics
+import metrics
+import pools
+import store
+import coordination
 
 # Load environment variables from .env file
 load_dotenv()
 
-app = FastAPI(title="LinkedIn Scraper API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Let in-flight file and LLM work finish, off the event loop. A running scrape
+    # still holds up process exit until it returns; see pools.shutdown
+    await asyncio.to_thread(pools.shutdown)
+
+app = FastAPI(title="LinkedIn Scraper API", version="1.0.0", lifespan=lifespan)
+
+# Work queue shared with worker.py and scheduler.py processes
+queue = coordination.WorkQueue()
 
 # Add CORS middleware
 app.add_middleware(
@@ -22,6 +38,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request, labelled by route template and status code."""
+    with metrics.stage("http_request", method=request.method) as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        span.label("path", route.path if route else "unmatched")
+        span.label("status", response.status_code)
+    return response
+
 class URLRequest(BaseModel):
     urls: List[str]
 
@@ -57,23 +83,22 @@ class ChatResponse(BaseModel):
 async def update_urls(request: URLRequest):
     """Update LinkedIn profile URLs in the url.txt file."""
     try:
-        # Ensure the directory exists
-        urls_dir = "data/urls"
-        os.makedirs(urls_dir, exist_ok=True)
-
         #strip url
         request.urls = [url.strip() for url in request.urls]
         
-        # Write URLs to file (one per line)
-        urls_file_path = os.path.join(urls_dir, "url.txt")
-        with open(urls_file_path, 'a') as f:
-            for url in request.urls:
-                print("WRITING URL: ", url)
-                f.write(f"{url.strip()}\n")
-
-        scrape_a_few_profiles(request.urls)
+        # File access, Selenium and Gemini all block, so each runs on its own pool
+        await pools.run_io(store.append_urls, request.urls)
+
+        # Lease the URLs to this request through the shared queue, so workers and
+        # other API processes don't scrape or extract them at the same time
+        owner = coordination.worker_id("api")
+        await pools.run_io(queue.enqueue, request.urls, "scrape", True)
+        scraped = await pools.run_scrape(scrape_profiles, request.urls, owner)
         print("SCRAPED PROFILES")
-        process_single_profile(request.urls)
+
+        urls = await pools.run_io(queue.claim, owner, "extract", len(scraped), urls=scraped) if scraped else []
+
+        await pools.run_llm(process_single_profile, urls, owner)
         print("PROCESSED PROFILES")
         
         return URLResponse(
@@ -89,8 +114,53 @@ async def root():
     """Health check endpoint."""
     return {"message": "LinkedIn Scraper API is running"}
 
-def process_single_profile(urls: list[str]):
-    """Process a single LinkedIn URL and extract profile information using Gemini API."""
+def scrape_profiles(urls: list[str], owner: str) -> list[str]:
+    """
+    Lease, scrape and clean the given profiles with Selenium.
+
+    The scrape jobs are claimed here, once a scrape thread is free, rather than
+    when the request arrives, and renewed before each URL, so leases don't run
+    out while the request waits behind another scrape or works through a batch.
+
+    Returns:
+        list: URLs that were saved and handed on to the extract stage
+    """
+    # Selenium and BeautifulSoup come in with the scheduler, here on the scrape
+    # thread, so read-only serving never loads them
+    from scheduler import scrape_a_few_profiles
+
+    urls = queue.claim(owner, "scrape", len(urls), urls=urls)
+    if not urls:
+        return []
+
+    try:
+        scraped = scrape_a_few_profiles(urls, queue, owner)
+    except Exception as e:
+        # Release the leases now rather than leaving them held until they expire
+        for url in urls:
+            queue.fail(owner, "scrape", url, str(e))
+        raise
+
+    # Only pages that were actually saved, under a lease still held, move on to extraction
+    handed_on = []
+    for url in urls:
+        if url not in scraped:
+            queue.fail(owner, "scrape", url, "Failed to save page")
+        elif queue.complete(owner, "scrape", url, next_stage="extract"):
+            handed_on.append(url)
+        else:
+            print(f"Lease on {url} expired before the scrape finished; leaving it to its new owner")
+    return handed_on
+
+def process_single_profile(urls: list[str], owner: Optional[str] = None):
+    """
+    Process LinkedIn URLs and upsert the extracted profiles using Gemini API.
+
+    If owner is given, the URLs are extract jobs leased to it and are marked
+    done or failed in the work queue.
+    """
+    from llm import process_linkedin_url, parse_gemini_profile
+
     try:
         # Get Gemini API key from environment
         gemini_api_key = os.getenv("GEMINI_API_KEY")
@@ -98,64 +168,33 @@ def process_single_profile(urls: list[str]):
             raise HTTPException(status_code=500, detail="GEMINI_API_KEY environment variable not set")
         
         for url in urls:
+            # The lease may have run out while this waited for an LLM thread
+            if owner and not queue.renew(owner, "extract", url):
+                print(f"Lost lease on {url}, skipping")
+                continue
             try:
                 # Process the URL using the LLM function
                 response = process_linkedin_url(url, gemini_api_key)
-
-                # Try to parse the JSON response from Gemini with better error handling
-                try:
-                    gemini_response = response["gemini_response"]
-                    
-                    # Additional cleaning in case the LLM function didn't catch everything
-                    if gemini_response.startswith('```') and gemini_response.endswith('```'):
-                        gemini_response = gemini_response.strip('```').strip()
-                        if gemini_response.startswith('json'):
-                            gemini_response = gemini_response[4:].strip()
-                    
-                    parsed_data = json.loads(gemini_response)
-                    parsed_data["linkedinUrl"] = url
-                    # Validate that we got a valid structure (object or list)
-                    if not isinstance(parsed_data, (dict, list)):
-                        raise ValueError("Response is not a valid JSON object or array")
-                        
-                except (json.JSONDecodeError, ValueError) as e:
-                    print(f"JSON parsing failed for {url}: {e}")
-                    print(f"Raw response: {response['gemini_response']}")
-                    # If JSON parsing fails, return structured error info
-                    parsed_data = {
-                        "error": "Failed to parse JSON response",
-                        "raw_response": response["gemini_response"],
-                        "parse_error": str(e)
-                    }
+                parsed_data = parse_gemini_profile(url, response["gemini_response"])
                 
                 # Add the processed profile to tempfile.txt
                 if parsed_data and not parsed_data.get("error"):
                     try:
-                        # Read existing profile data
-                        existing_data = []
-                        tempfile_path = "tempfile.txt"
-                        
-                        if os.path.exists(tempfile_path):
-                            try:
-                                with open(tempfile_path, 'r') as f:
-                                    existing_data = json.load(f)
-                            except (json.JSONDecodeError, FileNotFoundError):
-                                existing_data = []
-                        
-                        # Add new profile data to existing data
-                        existing_data.append(parsed_data)
-                        
-                        # Write updated data back to file
-                        with open(tempfile_path, 'w') as f:
-                            json.dump(existing_data, f, indent=2)
-                            
+                        store.upsert_profile(url, parsed_data)
                     except Exception as file_error:
                         print(f"Warning: Failed to update tempfile.txt: {file_error}")
+                        raise
+                else:
+                    raise ValueError(parsed_data["parse_error"])
                 
+                if owner and not queue.complete(owner, "extract", url):
+                    print(f"Lease on {url} expired during extraction; another worker will redo it")
                 print(f"Successfully processed and saved profile for {url}")
             
             except Exception as e:
                 print(f"Error processing {url}: {e}")
+                if owner:
+                    queue.fail(owner, "extract", url, str(e))
         
         # Return success response after processing all URLs
         return {
@@ -168,6 +207,60 @@ def process_single_profile(urls: list[str]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing profile: {str(e)}")
 
+def read_urls() -> list[str]:
+    """Read the URLs to process from url.txt."""
+    try:
+        return store.read_urls()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No URLs file found. Please upload URLs first using /update-urls")
+
+def extract_profile(url: str, gemini_api_key: str) -> ProfileResponse:
+    """Extract one profile with Gemini and wrap the outcome in a ProfileResponse."""
+    from llm import process_linkedin_url, parse_gemini_profile
+
+    try:
+        # Process each URL using the LLM function
+        response = process_linkedin_url(url, gemini_api_key)
+        print(f"Raw Gemini response for {url}: {response['gemini_response']}")
+        parsed_data = parse_gemini_profile(url, response["gemini_response"])
+        
+        return ProfileResponse(
+            url=url,
+            success=True,
+            data=parsed_data
+        )
+        
+    except Exception as e:
+        print(f"Error processing {url}: {e}")
+        return ProfileResponse(
+            url=url,
+            success=False,
+            error=str(e)
+        )
+
+def extract_leased_profile(url: str, gemini_api_key: str, owner: str) -> ProfileResponse:
+    """Extract a profile whose extract job is leased to owner, upsert it and settle the job."""
+    if not queue.renew(owner, "extract", url):
+        return ProfileResponse(url=url, success=False, error="Lease lost to another worker")
+
+    result = extract_profile(url, gemini_api_key)
+    if result.success and result.data.get("error"):
+        result = ProfileResponse(url=url, success=False, data=result.data, error=result.data["parse_error"])
+
+    if not result.success:
+        queue.fail(owner, "extract", url, result.error)
+        return result
+
+    try:
+        store.upsert_profile(url, result.data)
+    except Exception as e:
+        queue.fail(owner, "extract", url, str(e))
+        return ProfileResponse(url=url, success=False, error=str(e))
+
+    if not queue.complete(owner, "extract", url):
+        print(f"Lease on {url} expired during extraction; another worker will redo it")
+    return result
+
 @app.get("/process-profiles", response_model=ProcessResponse)
 async def process_all_profiles():
     """Process all LinkedIn URLs and extract profile information using Gemini API."""
@@ -179,71 +272,28 @@ async def process_all_profiles():
             raise HTTPException(status_code=500, detail="GEMINI_API_KEY environment variable not set")
         
         # Read URLs from file
-        urls_file_path = os.path.join("data/urls", "url.txt")
-        if not os.path.exists(urls_file_path):
-            raise HTTPException(status_code=404, detail="No URLs file found. Please upload URLs first using /update-urls")
-        
-        with open(urls_file_path, 'r') as f:
-            urls = [url.strip() for url in f.readlines() if url.strip()]
+        urls = await pools.run_io(read_urls)
         
         if not urls:
             raise HTTPException(status_code=404, detail="No URLs found in file")
         
-        results = []
-        successful = 0
-        
-        for url in urls:
-            try:
-                # Process each URL using the LLM function
-                response = process_linkedin_url(url, gemini_api_key)
-                
-                # Try to parse the JSON response from Gemini with better error handling
-                try:
-                    gemini_response = response["gemini_response"]
-                    print(f"Raw Gemini response for {url}: {gemini_response}")
-                    
-                    # Additional cleaning in case the LLM function didn't catch everything
-                    if gemini_response.startswith('```') and gemini_response.endswith('```'):
-                        gemini_response = gemini_response.strip('```').strip()
-                        if gemini_response.startswith('json'):
-                            gemini_response = gemini_response[4:].strip()
-                    
-                    parsed_data = json.loads(gemini_response)
-                    parsed_data["linkedinUrl"] = url
-                    
-                    # Validate that we got a valid structure (object or list)
-                    if not isinstance(parsed_data, (dict, list)):
-                        raise ValueError("Response is not a valid JSON object or array")
-                        
-                except (json.JSONDecodeError, ValueError) as e:
-                    print(f"JSON parsing failed for {url}: {e}")
-                    print(f"Raw response: {response['gemini_response']}")
-                    # If JSON parsing fails, return structured error info
-                    parsed_data = {
-                        "error": "Failed to parse JSON response",
-                        "raw_response": response["gemini_response"],
-                        "parse_error": str(e)
-                    }
-                
-                results.append(ProfileResponse(
-                    url=url,
-                    success=True,
-                    data=parsed_data
-                ))
-                successful += 1
-                
-            except Exception as e:
-                print(f"Error processing {url}: {e}")
-                results.append(ProfileResponse(
-                    url=url,
-                    success=False,
-                    error=str(e)
-                ))
-        
-        # Extract just the data from successful responses
-        profile_data = [result.data for result in results if result.success and result.data]
-        with open("tempfile.txt", "w") as f:
-            json.dump(profile_data, f, indent=2)
+        # Lease the extract jobs, so URLs workers or other API processes are
+        # already extracting are left to them rather than sent to Gemini twice
+        owner = coordination.worker_id("api")
+        urls = list(dict.fromkeys(urls))  # url.txt may list a URL more than once
+        await pools.run_io(queue.enqueue, urls, "extract", True)
+        claimed = await pools.run_io(queue.claim, owner, "extract", len(urls), urls=urls)
+
+        # Extract profiles concurrently, bounded by the LLM pool size, and upsert each
+        # one so profiles stored by others, or not re-extracted this time, are kept
+        leased = await asyncio.gather(*(pools.run_llm(extract_leased_profile, url, gemini_api_key, owner) for url in claimed))
+        held_elsewhere = set(urls) - set(claimed)
+        skipped = [
+            ProfileResponse(url=url, success=False, error="Already being processed by another worker")
+            for url in urls if url in held_elsewhere
+        ]
+        results = leased + skipped
+        successful = sum(1 for result in results if result.success)
         
         return ProcessResponse(
             results=results,
@@ -257,22 +307,64 @@ async def process_all_profiles():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing profiles: {str(e)}")
 
+def load_cached_profiles() -> str:
+    """Read tempfile.txt and return its content once it is known to be valid JSON."""
+    content = store.read_profiles_text().strip()
+    
+    # Check if file is empty
+    if not content:
+        raise HTTPException(status_code=404, detail="No cached profile data found. File is empty.")
+    
+    # Validate the JSON content
+    json.loads(content)
+    
+    return content
+
+def check_cached_profiles() -> None:
+    """
+    Raise before a streamed response starts if the store is empty or is not a
+    JSON array. The rest of the file is only decoded while streaming.
+    """
+    with open(store.PROFILES_PATH, 'r') as f:
+        start = ""
+        while not start:
+            chunk = f.read(store.STREAM_READ_SIZE)
+            if not chunk:
+                raise HTTPException(status_code=404, detail="No cached profile data found. File is empty.")
+            start = chunk.lstrip()
+    if start[0] != "[":
+        raise json.JSONDecodeError("Expected a profile array", start, 0)
+
 @app.get("/profiles")
-async def read_cached_profile():
-    """Read cached profile data."""
+async def read_cached_profile(request: Request, format: Optional[str] = None, fields: Optional[str] = None):
+    """
+    Read cached profile data.
+
+    With format=ndjson (or an Accept: application/x-ndjson header) or a fields
+    list, profiles are streamed from the store one record at a time, so memory
+    per request stays bounded however large the alumni set is.
+
+    Unlike the buffered response, a streamed one is sent before the whole store
+    is decoded: only the start of the file is checked up front, and a decode
+    error further in ends the connection with a truncated body instead of a 400.
+    """
+    if format is None and "application/x-ndjson" in request.headers.get("accept", ""):
+        format = "ndjson"
+    if format not in (None, "json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
     try:
-        # Read the JSON file using context manager for better file handling
-        with open("tempfile.txt", 'r') as f:
-            content = f.read().strip()
-            
-            # Check if file is empty
-            if not content:
-                raise HTTPException(status_code=404, detail="No cached profile data found. File is empty.")
-            
-            # Parse the JSON content
-            profile_data = json.loads(content)
-        
-        return profile_data
+        if format == "ndjson" or field_list:
+            await pools.run_io(check_cached_profiles)
+            # Starlette iterates the sync generator on its threadpool
+            if format == "ndjson":
+                return StreamingResponse(store.stream_profiles_ndjson(field_list), media_type="application/x-ndjson")
+            return StreamingResponse(store.stream_profiles_json(field_list), media_type="application/json")
+
+        # The file already holds the JSON response, so serve it as-is instead of re-encoding
+        content = await pools.run_io(load_cached_profiles)
+        return Response(content=content, media_type="application/json")
     
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="No cached profile data found. Please process profiles first.")
@@ -284,6 +376,34 @@ async def read_cached_profile():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading profile: {str(e)}")
 
+@app.get("/analytics")
+async def read_analytics(limit: int = 10):
+    """Serve precomputed aggregates over the cached profile data."""
+    try:
+        state = await pools.run_io(analytics.current_analytics, store.PROFILES_PATH)
+        return analytics.summarize(state, limit=limit)
+    
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON format in cached profile data")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading analytics: {str(e)}")
+
+def load_alumni_data() -> str:
+    """Return the alumni profiles in tempfile.txt as JSON text, or "" if there are none."""
+    content = store.read_profiles_text()
+
+    # Parse only to validate; the file is already indented the way the prompt embeds it
+    if not json.loads(content):
+        return ""
+    return content
+
+def answer_query(query: str, alumni_data: str, gemini_api_key: str) -> dict:
+    """Answer a question about the alumni data with Gemini."""
+    # The Gemini SDK comes in with llm on the first LLM call, on a pool thread,
+    # rather than at startup; the other llm imports in this module do the same
+    from llm import query_alumni_data
+    return query_alumni_data(query, alumni_data, gemini_api_key)
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat_with_alumni_data(request: ChatRequest):
     """Chat endpoint that answers questions about alumni data."""
@@ -295,8 +415,7 @@ async def chat_with_alumni_data(request: ChatRequest):
         
         # Read alumni data from tempfile.txt
         try:
-            with open("tempfile.txt", 'r') as f:
-                alumni_data = json.load(f)
+            alumni_data = await pools.run_io(load_alumni_data)
         except FileNotFoundError:
             raise HTTPException(status_code=404, detail="No alumni data found. Please process profiles first using /process-profiles")
         except json.JSONDecodeError:
@@ -307,7 +426,7 @@ async def chat_with_alumni_data(request: ChatRequest):
         
         # Query the alumni data using Gemini
         try:
-            response = query_alumni_data(request.query, alumni_data, gemini_api_key)
+            response = await pools.run_llm(answer_query, request.query, alumni_data, gemini_api_key)
             
             return ChatResponse(
                 query=response["query"],
@@ -329,6 +448,11 @@ async def chat_with_alumni_data(request: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics():
+    """Per-stage durations, counts, bytes and token usage in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
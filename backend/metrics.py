@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from functools import wraps
+from typing import Optional
+
+# METRICS_ENABLED=0 turns every call below into a no-op; TRACE_FILE enables span traces (JSON lines)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+TRACE_FILE = os.getenv("TRACE_FILE")
+
+PREFIX = "asb"
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_lock = threading.Lock()
+_trace_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted((key, str(value)) for key, value in labels.items())))
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    """Add value to a counter, e.g. inc("stage_bytes_total", 1024, stage="clean_html", direction="in")."""
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record a value in a histogram with DURATION_BUCKETS."""
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": [0] * len(DURATION_BUCKETS), "sum": 0.0, "count": 0}
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                histogram["buckets"][index] += 1
+                break
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+def histogram_sum(name: str, **labels) -> float:
+    """Return the sum of the values observed in a histogram, 0 if there are none."""
+    with _lock:
+        histogram = _histograms.get(_key(name, labels))
+        return histogram["sum"] if histogram else 0.0
+
+class Span:
+    """A timed unit of work; attributes set on it end up in its trace record."""
+
+    __slots__ = ("stage", "labels", "attributes", "span_id", "parent_id", "trace_id", "start", "_token")
+
+    def __init__(self, stage: str, labels: dict):
+        self.stage = stage
+        self.labels = labels
+        self.attributes = {}
+
+    def set(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def label(self, key: str, value) -> None:
+        """Set a metric label that is only known once the work has run, e.g. a status code."""
+        self.labels[key] = value
+
+    def add_bytes(self, count: int, direction: str) -> None:
+        """Count bytes read or written by this stage."""
+        inc("stage_bytes_total", count, stage=self.stage, direction=direction, **self.labels)
+        self.attributes[f"bytes_{direction}"] = self.attributes.get(f"bytes_{direction}", 0) + count
+
+    def add_tokens(self, count: Optional[int], kind: str) -> None:
+        """Count LLM tokens used by this stage; kind is "prompt" or "output"."""
+        if not count:
+            return
+        inc("llm_tokens_total", count, stage=self.stage, kind=kind, **self.labels)
+        self.attributes[f"tokens_{kind}"] = self.attributes.get(f"tokens_{kind}", 0) + count
+
+    def __enter__(self):
+        if TRACE_FILE:
+            parent = _current_span.get()
+            self.span_id = uuid.uuid4().hex[:16]
+            self.parent_id = parent.span_id if parent else None
+            self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+            self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        observe("stage_duration_seconds", duration, stage=self.stage, **self.labels)
+        inc("stage_calls_total", stage=self.stage, **self.labels)
+        if exc_type is not None:
+            inc("stage_errors_total", stage=self.stage, **self.labels)
+
+        if TRACE_FILE:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:
+                # A generator's span can close in another context than it opened
+                # in (each step of a streamed response runs on a pool thread)
+                pass
+            record = {
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "stage": self.stage,
+                "labels": self.labels,
+                "start": time.time() - duration,
+                "duration_s": duration,
+                "error": exc_type.__name__ if exc_type else None,
+                "attributes": self.attributes,
+            }
+            with _trace_lock:
+                with open(TRACE_FILE, 'a') as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+        return False
+
+class _NoopSpan:
+    """Shared stand-in used when metrics are disabled."""
+
+    def set(self, key, value):
+        pass
+
+    def label(self, key, value):
+        pass
+
+    def add_bytes(self, count, direction):
+        pass
+
+    def add_tokens(self, count, kind):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+def stage(name: str, **labels):
+    """
+    Time a block of work as a pipeline stage.
+
+    Example:
+        with metrics.stage("clean_html") as span:
+            span.add_bytes(len(html), "in")
+    """
+    if not METRICS_ENABLED:
+        return _NOOP_SPAN
+    return Span(name, labels)
+
+def timed(name: str):
+    """Decorator form of stage() for functions that need no extra attributes."""
+    def decorator(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _format_labels(labels: tuple, extra: Optional[tuple] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = [(key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for key, value in items]
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+def render() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]} for key, value in _histograms.items()}
+
+    lines = []
+    for metric in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}_{metric} counter")
+        for (name, labels), value in sorted(counters.items()):
+            if name == metric:
+                lines.append(f"{PREFIX}_{metric}{_format_labels(labels)} {value}")
+
+    for metric in sorted({name for name, _ in histograms}):
+        lines.append(f"# TYPE {PREFIX}_{metric} histogram")
+        for (name, labels), histogram in sorted(histograms.items()):
+            if name != metric:
+                continue
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS, histogram["buckets"]):
+                cumulative += count
+                lines.append(f"{PREFIX}_{metric}_bucket{_format_labels(labels, ('le', bound))} {cumulative}")
+            lines.append(f"{PREFIX}_{metric}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram['count']}")
+            lines.append(f"{PREFIX}_{metric}_sum{_format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{PREFIX}_{metric}_count{_format_labels(labels)} {histogram['count']}")
+
+    return "\n".join(lines) + "\n"
+
+def reset() -> None:
+    """Drop all recorded metrics."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
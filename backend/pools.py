@@ -0,0 +1,56 @@
+import os
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+# Thread pools for blocking work called from async endpoints, sized per kind of work:
+# file access, Gemini calls and Selenium scraping (one browser per thread)
+POOL_SIZES = {
+    "io": int(os.getenv("IO_POOL_SIZE", "8")),
+    "llm": int(os.getenv("LLM_POOL_SIZE", "8")),
+    "scrape": int(os.getenv("SCRAPE_POOL_SIZE", "1")),
+}
+
+_pools = {}
+
+def get_pool(kind: str) -> ThreadPoolExecutor:
+    """Return the pool for a kind of work, creating it on first use."""
+    pool = _pools.get(kind)
+    if pool is None:
+        pool = _pools[kind] = ThreadPoolExecutor(max_workers=POOL_SIZES[kind], thread_name_prefix=f"{kind}-pool")
+    return pool
+
+async def run_in_pool(kind: str, func, *args, **kwargs):
+    """
+    Run a blocking function on one of the pools without blocking the event loop.
+
+    The caller's context is carried over so metrics spans nest under the request.
+    """
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_pool(kind), call)
+
+async def run_io(func, *args, **kwargs):
+    return await run_in_pool("io", func, *args, **kwargs)
+
+async def run_llm(func, *args, **kwargs):
+    return await run_in_pool("llm", func, *args, **kwargs)
+
+async def run_scrape(func, *args, **kwargs):
+    return await run_in_pool("scrape", func, *args, **kwargs)
+
+def shutdown() -> None:
+    """
+    Stop all pools, waiting for file and Gemini work to finish.
+
+    Scrapes queued behind a running one are cancelled. The running scrape is not
+    interrupted: concurrent.futures joins pool threads at interpreter exit, so
+    the process only exits once it returns, which for a login stuck waiting on
+    2FA means until it is killed. Its leases then expire back into the queue.
+    """
+    for kind, pool in _pools.items():
+        if kind == "scrape":
+            pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            pool.shutdown(wait=True)
+    _pools.clear()
@@ -3,64 +3,86 @@ import time
 from scrape_profile import login_to_linkedin, save_html
 from selenium import webdriver
 import os
+import shutil
+import tempfile
 from dotenv import load_dotenv
-from chop import process_html_files, clean_root_directory
+from pathlib import Path
+import store
+from typing import Optional
+from coordination import DEFAULT_LEASE_SECONDS, WorkQueue, worker_id
+from worker import run_worker, save_chopped
 
-def scrape_a_few_profiles(profiles: list[str]):
-    """Run the LinkedIn scraper."""
+def scrape_a_few_profiles(
+    profiles: list[str],
+    queue: Optional[WorkQueue] = None,
+    owner: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+) -> list[str]:
+    """
+    Run the LinkedIn scraper.
+
+    Args:
+        profiles: Profile URLs to scrape
+        queue: Work queue holding scrape leases on the URLs, renewed before each one
+        owner: Lease owner, required with queue
+        lease_seconds: Lease length to renew to
+
+    Returns:
+        list: URLs whose page was saved and cleaned
+    """
     print(f"Running scraper at {time.strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Delete all files in the data directory
-    clean_root_directory("data")
-    
+    # Save pages to a scratch directory of this call's own; data/ is shared with
+    # the work queue and with concurrent scrapes
+    scratch_dir = tempfile.mkdtemp(prefix="scrape-")
     driver = webdriver.Chrome()
+    scraped = []
     
-    # Login with custom function
-    if login_to_linkedin(driver, os.getenv("LINKEDIN_EMAIL"), os.getenv("LINKEDIN_PASSWORD")):
-        # Save HTML for each profile
-        for profile_url in profiles:
-            save_html(driver, profile_url)
-            time.sleep(2)  # Small delay between profiles
-        process_html_files("data", "data/chopped/data", should_clean=False)
-    else:
-        print("Failed to login. Please check your credentials and try again.")
-    
-    driver.quit()
+    try:
+        # Login with custom function
+        if login_to_linkedin(driver, os.getenv("LINKEDIN_EMAIL"), os.getenv("LINKEDIN_PASSWORD")):
+            # Save HTML for each profile
+            for profile_url in profiles:
+                # Scraping takes ~12s per URL, so a long batch would outlive its leases;
+                # skip URLs another worker has taken over
+                if queue is not None and not queue.renew(owner, "scrape", profile_url, lease_seconds):
+                    print(f"Lost lease on {profile_url}, skipping")
+                    continue
+                filename = save_html(driver, profile_url, scratch_dir)
+                if filename:
+                    save_chopped(Path(filename))
+                    scraped.append(profile_url)
+                time.sleep(2)  # Small delay between profiles
+        else:
+            print("Failed to login. Please check your credentials and try again.")
+    finally:
+        driver.quit()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    return scraped
 
 def run_scraper():
-    """Run the LinkedIn scraper."""
+    """Queue every URL in url.txt for scraping and work through the scrape jobs."""
     print(f"Running scraper at {time.strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Delete all files in the data directory
-    clean_root_directory("data")
-    
-    driver = webdriver.Chrome()
-    
-    # Login with custom function
-    if login_to_linkedin(driver, os.getenv("LINKEDIN_EMAIL"), os.getenv("LINKEDIN_PASSWORD")):
-        # Read profiles from urls.txt file
+    # Read profiles from urls.txt file
+    try:
+        profiles = store.read_urls()
+    except FileNotFoundError:
+        print("URLs file not found. Using empty profile list.")
+        profiles = []
+    except Exception as e:
+        print(f"Error reading URLs file: {e}. Using empty profile list.")
         profiles = []
-        urls_file_path = "data/urls/url.txt"
-        
-        try:
-            if os.path.exists(urls_file_path):
-                with open(urls_file_path, 'r') as f:
-                    profiles = [line.strip() for line in f.readlines() if line.strip()]
-            else:
-                print("URLs file not found. Using empty profile list.")
-        except Exception as e:
-            print(f"Error reading URLs file: {e}. Using empty profile list.")
-            profiles = []
-        
-        # Save HTML for each profile
-        for profile_url in profiles:
-            save_html(driver, profile_url)
-            time.sleep(2)  # Small delay between profiles
-        process_html_files("data", "data/chopped/data", should_clean=True)
-    else:
-        print("Failed to login. Please check your credentials and try again.")
     
-    driver.quit()
+    # Jobs already leased by another scheduler, worker or API request are left to them,
+    # so several scraper processes can share the URL set without overlap
+    queue = WorkQueue()
+    queue.enqueue(profiles, "scrape", requeue=True)
+    try:
+        processed = run_worker(["scrape"], queue, owner=worker_id("scheduler"), exit_when_idle=True)
+        print(f"Scraped {processed} profiles")
+    except RuntimeError as e:
+        print(e)
 
 def main():
     load_dotenv()
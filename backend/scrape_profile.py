@@ -6,6 +6,7 @@ import os
 from dotenv import load_dotenv
 import time
 from datetime import datetime
+import metrics
 
 def login_to_linkedin(driver, email, password):
     """Custom login function for LinkedIn."""
@@ -47,21 +48,25 @@ def login_to_linkedin(driver, email, password):
 def save_html(driver, profile_url, output_dir="data"):
     """Save the HTML content of a profile page."""
     try:
-        print(f"Navigating to profile: {profile_url}")
-        driver.get(profile_url)
-        time.sleep(10)  # Wait for page to load
+        with metrics.stage("save_html") as span:
+            print(f"Navigating to profile: {profile_url}")
+            with metrics.stage("page_load"):
+                driver.get(profile_url)
+                time.sleep(10)  # Wait for page to load
 
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
+            # Create output directory if it doesn't exist
+            os.makedirs(output_dir, exist_ok=True)
 
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        profile_id = profile_url.split("/in/")[-1].rstrip("/")
-        filename = f"{output_dir}/{profile_id}_{timestamp}.html"
+            # Generate filename with timestamp
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            profile_id = profile_url.split("/in/")[-1].rstrip("/")
+            filename = f"{output_dir}/{profile_id}_{timestamp}.html"
 
-        # Save the page source
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(driver.page_source)
+            # Save the page source
+            page_source = driver.page_source
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(page_source)
+            span.add_bytes(len(page_source), "out")
         
         print(f"HTML saved to {filename}")
         return filename
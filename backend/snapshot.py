@@ -0,0 +1,285 @@
+import os
+import json
+import hashlib
+import argparse
+import logging
+from pathlib import Path
+from typing import Optional, Union
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from coordination import file_lock
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = "data/snapshot"
+MANIFEST_NAME = "manifest.json"
+
+# Compact once superseded rows outnumber this fraction of live rows, or parts pile up
+COMPACT_DEAD_RATIO = 0.25
+COMPACT_MAX_PARTS = 32
+
+COUNT_SECTIONS = ["experience", "education", "skills", "projects", "certifications", "awards"]
+
+SCHEMAS = {
+    "profiles": pa.schema(
+        [("linkedinUrl", pa.string()), ("name", pa.string()), ("headline", pa.string()), ("location", pa.string())]
+        + [(f"{section}Count", pa.int32()) for section in COUNT_SECTIONS]
+    ),
+    "experience": pa.schema([
+        ("linkedinUrl", pa.string()),
+        ("position", pa.int32()),
+        ("title", pa.string()),
+        ("company", pa.string()),
+        ("duration", pa.string()),
+        ("location", pa.string()),
+        ("description", pa.string()),
+    ]),
+    "education": pa.schema([
+        ("linkedinUrl", pa.string()),
+        ("position", pa.int32()),
+        ("institution", pa.string()),
+        ("degree", pa.string()),
+        ("field", pa.string()),
+        ("duration", pa.string()),
+        ("description", pa.string()),
+    ]),
+    "skills": pa.schema([
+        ("linkedinUrl", pa.string()),
+        ("position", pa.int32()),
+        ("skill", pa.string()),
+    ]),
+}
+
+def _text(value) -> Optional[str]:
+    """Coerce an LLM-extracted field to a string column value."""
+    if value is None:
+        return None
+    return value if isinstance(value, str) else json.dumps(value)
+
+def _section(profile: dict, section: str) -> list:
+    value = profile.get(section)
+    entries = value if isinstance(value, list) else []
+    # Experience and education rows are built from dict entries only; anything
+    # else the LLM put in those lists is dropped from both the rows and the counts
+    if section in ("experience", "education"):
+        entries = [entry for entry in entries if isinstance(entry, dict)]
+    return entries
+
+def flatten_profiles(profiles: list) -> dict:
+    """
+    Flatten nested profile dicts into one Arrow table per entity.
+
+    Args:
+        profiles: Profile dicts as stored in tempfile.txt
+
+    Returns:
+        dict: Table name -> pyarrow.Table, child tables keyed by linkedinUrl
+    """
+    columns = {name: {field.name: [] for field in schema} for name, schema in SCHEMAS.items()}
+
+    for profile in profiles:
+        url = profile["linkedinUrl"]
+
+        row = columns["profiles"]
+        row["linkedinUrl"].append(url)
+        for field in ["name", "headline", "location"]:
+            row[field].append(_text(profile.get(field)))
+        for section in COUNT_SECTIONS:
+            row[f"{section}Count"].append(len(_section(profile, section)))
+
+        for child in ["experience", "education"]:
+            table = columns[child]
+            for position, entry in enumerate(_section(profile, child)):
+                table["linkedinUrl"].append(url)
+                table["position"].append(position)
+                for field in SCHEMAS[child].names[2:]:
+                    table[field].append(_text(entry.get(field)))
+
+        table = columns["skills"]
+        for position, skill in enumerate(_section(profile, "skills")):
+            table["linkedinUrl"].append(url)
+            table["position"].append(position)
+            table["skill"].append(_text(skill))
+
+    return {name: pa.Table.from_pydict(columns[name], schema=SCHEMAS[name]) for name in SCHEMAS}
+
+def profile_hash(profile: dict) -> str:
+    """Return a stable content hash used to detect changed profiles."""
+    return hashlib.sha1(json.dumps(profile, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _part_path(snapshot_dir: Path, table: str, part: int) -> Path:
+    return snapshot_dir / table / f"part-{part:05d}.arrow"
+
+def load_manifest(snapshot_dir: Union[str, Path] = SNAPSHOT_DIR) -> dict:
+    """Load the snapshot manifest, or an empty one if no snapshot exists yet."""
+    try:
+        with open(Path(snapshot_dir) / MANIFEST_NAME, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"profiles": {}, "parts": {}, "next_part": 0}
+
+def _save_manifest(manifest: dict, snapshot_dir: Path) -> None:
+    tmp_path = snapshot_dir / f"{MANIFEST_NAME}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, snapshot_dir / MANIFEST_NAME)
+
+def _write_part(snapshot_dir: Path, part: int, profiles: list) -> int:
+    """Write one part file per table for the given profiles and return its row count."""
+    tables = flatten_profiles(profiles)
+    for name, table in tables.items():
+        path = _part_path(snapshot_dir, name, part)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Uncompressed IPC files so readers can memory-map them
+        with pa.OSFile(str(path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    return len(profiles)
+
+def _remove_parts(snapshot_dir: Path, parts: list) -> None:
+    for part in parts:
+        for name in SCHEMAS:
+            try:
+                _part_path(snapshot_dir, name, int(part)).unlink()
+            except FileNotFoundError:
+                pass
+
+def export_snapshot(profiles: list, snapshot_dir: Union[str, Path] = SNAPSHOT_DIR) -> dict:
+    """
+    Materialize profiles into columnar part files, writing only what changed.
+
+    Changed and new profiles are appended as a new part; the manifest maps each
+    linkedinUrl to the part holding its current version, so superseded rows are
+    skipped on load. Parts are compacted once too many rows are superseded.
+
+    Args:
+        profiles: Full list of profile dicts from the store
+        snapshot_dir: Directory holding the manifest and part files
+
+    Returns:
+        dict: Counts of changed, removed and live profiles
+    """
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    # Exports read the manifest, allocate the next part and replace the manifest;
+    # two at once would write the same part and one manifest would be lost
+    with file_lock(snapshot_dir / MANIFEST_NAME):
+        manifest = load_manifest(snapshot_dir)
+
+        current = {}
+        for profile in profiles:
+            # Skip failed extractions, which carry an error instead of profile fields
+            if isinstance(profile, dict) and profile.get("linkedinUrl") and not profile.get("error"):
+                current[profile["linkedinUrl"]] = profile
+
+        hashes = {url: profile_hash(profile) for url, profile in current.items()}
+        changed = [url for url, digest in hashes.items() if manifest["profiles"].get(url, {}).get("hash") != digest]
+        removed = [url for url in manifest["profiles"] if url not in current]
+
+        if not changed and not removed:
+            return {"changed": 0, "removed": 0, "live": len(current)}
+
+        parts = manifest["parts"]
+        for url in changed + removed:
+            entry = manifest["profiles"].pop(url, None)
+            if entry is not None:
+                parts[str(entry["part"])]["live"] -= 1
+
+        # Parts with no live rows left are dropped outright and don't count as dead weight
+        stale_parts = [part for part, info in parts.items() if info["live"] == 0]
+        live = sum(info["live"] for info in parts.values()) + len(changed)
+        dead = sum(info["rows"] - info["live"] for info in parts.values() if info["live"] > 0)
+
+        if dead > live * COMPACT_DEAD_RATIO or len(parts) + 1 > COMPACT_MAX_PARTS:
+            # Rewrite everything that is live into a single part
+            stale_parts = list(parts)
+            write_urls = list(current)
+            parts = {}
+            manifest["profiles"] = {}
+        else:
+            write_urls = changed
+            for part in stale_parts:
+                del parts[part]
+
+        part = manifest["next_part"]
+        if write_urls:
+            rows = _write_part(snapshot_dir, part, [current[url] for url in write_urls])
+            parts[str(part)] = {"rows": rows, "live": rows}
+            for url in write_urls:
+                manifest["profiles"][url] = {"hash": hashes[url], "part": part}
+            manifest["next_part"] = part + 1
+
+        manifest["parts"] = parts
+        _save_manifest(manifest, snapshot_dir)
+        _remove_parts(snapshot_dir, stale_parts)
+
+        logger.info(f"Snapshot updated: {len(changed)} changed, {len(removed)} removed, part {part}")
+        return {"changed": len(changed), "removed": len(removed), "live": len(current)}
+
+def load_table(name: str, snapshot_dir: Union[str, Path] = SNAPSHOT_DIR) -> pa.Table:
+    """
+    Load one flattened table from the snapshot using memory-mapped part files.
+
+    Parts without superseded rows are returned zero-copy; only parts that
+    still hold old versions of a profile are filtered.
+
+    Args:
+        name: One of "profiles", "experience", "education" or "skills"
+        snapshot_dir: Directory holding the manifest and part files
+
+    Returns:
+        pyarrow.Table: Current rows of the table
+    """
+    snapshot_dir = Path(snapshot_dir)
+    # Shared lock so an export can't remove the parts listed in the manifest
+    # before they are mapped; mapped parts stay readable once unlinked
+    with file_lock(snapshot_dir / MANIFEST_NAME, shared=True):
+        manifest = load_manifest(snapshot_dir)
+        sources = {
+            part: pa.memory_map(str(_part_path(snapshot_dir, name, int(part))), 'r')
+            for part in manifest["parts"]
+        }
+
+    live_urls = {}
+    for url, entry in manifest["profiles"].items():
+        live_urls.setdefault(str(entry["part"]), []).append(url)
+
+    tables = []
+    for part, info in sorted(manifest["parts"].items(), key=lambda item: int(item[0])):
+        table = pa.ipc.open_file(sources[part]).read_all()
+        if info["live"] < info["rows"]:
+            mask = pc.is_in(table["linkedinUrl"], value_set=pa.array(live_urls.get(part, []), pa.string()))
+            table = table.filter(mask)
+        tables.append(table)
+
+    if not tables:
+        return SCHEMAS[name].empty_table()
+    return pa.concat_tables(tables)
+
+def write_parquet(snapshot_dir: Union[str, Path] = SNAPSHOT_DIR) -> None:
+    """Write a consolidated <table>.parquet file per table for external tools."""
+    snapshot_dir = Path(snapshot_dir)
+    for name in SCHEMAS:
+        pq.write_table(load_table(name, snapshot_dir), snapshot_dir / f"{name}.parquet")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export cached profiles to a columnar snapshot.")
+    parser.add_argument("--source", default="tempfile.txt", help="Profile store to export")
+    parser.add_argument("--output", default=SNAPSHOT_DIR, help="Snapshot directory")
+    parser.add_argument("--parquet", action="store_true", help="Also write consolidated Parquet files")
+    args = parser.parse_args()
+
+    with open(args.source, 'r') as f:
+        content = f.read().strip()
+    profiles = json.loads(content) if content else []
+
+    result = export_snapshot(profiles, args.output)
+    if args.parquet:
+        write_parquet(args.output)
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import os
+import re
+import json
+import time
+import threading
+from typing import Iterator, Optional
+import analytics
+import metrics
+from coordination import file_lock
+
+PROFILES_PATH = "tempfile.txt"
+URLS_PATH = os.path.join("data/urls", "url.txt")
+
+# Bytes read per step when streaming profiles, and records per chunk written to the client
+STREAM_READ_SIZE = 64 * 1024
+STREAM_BATCH_SIZE = 64
+JSON_WHITESPACE = " \t\n\r"
+SCALAR_END = re.compile(r"[,\]\s]")
+
+try:
+    import orjson
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _write_json_atomic(path: str, data) -> int:
+    """
+    Write JSON to a temporary file and rename it over path, so readers in other
+    processes see either the old or the new file, never a partial one.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+def append_urls(urls: list[str]) -> None:
+    """Append URLs to url.txt, one per line."""
+    os.makedirs(os.path.dirname(URLS_PATH), exist_ok=True)
+    with file_lock(URLS_PATH), metrics.stage("store_write", file="url.txt") as span, open(URLS_PATH, 'a') as f:
+        for url in urls:
+            print("WRITING URL: ", url)
+            f.write(f"{url.strip()}\n")
+        span.add_bytes(sum(len(url) + 1 for url in urls), "out")
+
+def read_urls() -> list[str]:
+    """Read the URLs in url.txt; raises FileNotFoundError if none were uploaded yet."""
+    with file_lock(URLS_PATH, shared=True), metrics.stage("store_read", file="url.txt") as span, open(URLS_PATH, 'r') as f:
+        span.add_bytes(os.fstat(f.fileno()).st_size, "in")
+        return [url.strip() for url in f.readlines() if url.strip()]
+
+def read_profiles_text() -> str:
+    """Return the raw JSON text of tempfile.txt."""
+    # Writers replace the file atomically, so reads need no lock
+    with metrics.stage("store_read", file="tempfile.txt") as span, open(PROFILES_PATH, 'r') as f:
+        content = f.read()
+        span.add_bytes(len(content), "in")
+    return content
+
+def iter_profiles(path: str = PROFILES_PATH) -> Iterator[dict]:
+    """
+    Yield the profiles in the store one at a time without loading the whole file.
+
+    The file is read in STREAM_READ_SIZE steps and each array element is decoded
+    on its own, so memory stays at about one profile plus one read buffer. The
+    array syntax around the elements is checked as strictly as json.loads does;
+    malformed input raises json.JSONDecodeError when the parser reaches it.
+    """
+    decoder = json.JSONDecoder()
+
+    with metrics.stage("store_stream", file="tempfile.txt") as span, open(path, 'r') as f:
+        buffer = ""
+        pos = 0
+        # What comes next: "[" to open, a "value" or "]" right after it, a
+        # "value" after a comma, a "," or "]" after a value, then only whitespace
+        expected = "["
+        eof = False
+
+        try:
+            while True:
+                while pos < len(buffer) and buffer[pos] in JSON_WHITESPACE:
+                    pos += 1
+
+                if pos == len(buffer):
+                    if eof:
+                        if expected == "end":
+                            return
+                        raise json.JSONDecodeError("Unterminated profile array", buffer, pos)
+                    chunk = f.read(STREAM_READ_SIZE)
+                    span.add_bytes(len(chunk), "in")
+                    eof = not chunk
+                    buffer, pos = chunk, 0
+                    continue
+
+                char = buffer[pos]
+                if expected == "[":
+                    if char != "[":
+                        raise json.JSONDecodeError("Expected a profile array", buffer, pos)
+                    expected, pos = "first", pos + 1
+                elif expected == "end":
+                    raise json.JSONDecodeError("Extra data", buffer, pos)
+                elif char == "]" and expected in ("first", "separator"):
+                    expected, pos = "end", pos + 1
+                elif expected == "separator":
+                    if char != ",":
+                        raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                    expected, pos = "value", pos + 1
+                else:
+                    try:
+                        # A number or literal cut off by the buffer end would decode
+                        # short, so only decode one once its delimiter is buffered
+                        if not eof and buffer[pos] not in "{[\"" and not SCALAR_END.search(buffer, pos):
+                            raise json.JSONDecodeError("Value may continue", buffer, pos)
+                        profile, end = decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        # The element may continue past the buffer; read more and retry
+                        chunk = f.read(STREAM_READ_SIZE)
+                        span.add_bytes(len(chunk), "in")
+                        eof = not chunk
+                        buffer, pos = buffer[pos:] + chunk, 0
+                        continue
+                    yield profile
+                    expected, pos = "separator", end
+        except GeneratorExit:
+            # The client went away mid-stream; that ends the stage but is not an error
+            span.set("abandoned", True)
+            return
+
+def project(profile: dict, fields: Optional[list[str]]) -> dict:
+    """Keep only the requested top-level fields of a profile."""
+    if not fields:
+        return profile
+    return {field: profile[field] for field in fields if field in profile}
+
+def stream_profiles_ndjson(fields: Optional[list[str]] = None) -> Iterator[bytes]:
+    """Yield the store as newline-delimited JSON, STREAM_BATCH_SIZE records per chunk."""
+    batch = []
+    for profile in iter_profiles():
+        batch.append(dumps(project(profile, fields)))
+        if len(batch) == STREAM_BATCH_SIZE:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+def stream_profiles_json(fields: Optional[list[str]] = None) -> Iterator[bytes]:
+    """Yield the store as a single JSON array, written in chunks."""
+    yield b"["
+    batch = []
+    first = True
+    for profile in iter_profiles():
+        batch.append(dumps(project(profile, fields)))
+        if len(batch) == STREAM_BATCH_SIZE:
+            yield (b"" if first else b",") + b",".join(batch)
+            batch = []
+            first = False
+    if batch:
+        yield (b"" if first else b",") + b",".join(batch)
+    yield b"]"
+
+def write_profiles(profile_data: list) -> None:
+    """Replace tempfile.txt with a freshly processed set of profiles."""
+    with file_lock(PROFILES_PATH):
+        with metrics.stage("store_write", file="tempfile.txt") as span:
+            span.add_bytes(_write_json_atomic(PROFILES_PATH, profile_data), "out")
+        analytics.record_rebuild(profile_data, PROFILES_PATH)
+
+def upsert_profile(url: str, parsed_data: dict) -> None:
+    """
+    Replace the stored profile for url, or add it if it is new.
+
+    The read-modify-write runs under an exclusive lock so concurrent API
+    workers and extractor processes don't drop each other's updates.
+    """
+    with file_lock(PROFILES_PATH):
+        previous_source = analytics.source_signature(PROFILES_PATH)
+
+        # Read existing profile data
+        existing_data = []
+        try:
+            with metrics.stage("store_read", file="tempfile.txt") as span, open(PROFILES_PATH, 'r') as f:
+                span.add_bytes(os.fstat(f.fileno()).st_size, "in")
+                existing_data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            existing_data = []
+
+        # Replace the existing entry for this URL, or add a new one
+        old_profile = None
+        for index, profile in enumerate(existing_data):
+            if isinstance(profile, dict) and profile.get("linkedinUrl") == url:
+                old_profile = profile
+                existing_data[index] = parsed_data
+                break
+        else:
+            existing_data.append(parsed_data)
+
+        # Write updated data back to file
+        with metrics.stage("store_write", file="tempfile.txt") as span:
+            span.add_bytes(_write_json_atomic(PROFILES_PATH, existing_data), "out")
+
+        # Fold the change into the precomputed aggregates
+        analytics.record_upsert(old_profile, parsed_data, PROFILES_PATH, previous_source)
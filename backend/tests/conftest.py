@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend modules import each other by bare name, as they do when run from backend/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Run the test from an empty backend working directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
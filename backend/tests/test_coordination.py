@@ -0,0 +1,118 @@
+import sqlite3
+
+import pytest
+
+from coordination import WorkQueue
+
+@pytest.fixture
+def queue(workspace):
+    return WorkQueue(str(workspace / "queue.db"), max_attempts=2)
+
+def job(queue, stage, url):
+    with sqlite3.connect(queue.path) as conn:
+        row = conn.execute(
+            "SELECT status, owner, attempts, last_error FROM jobs WHERE stage = ? AND url = ?",
+            (stage, url),
+        ).fetchone()
+    return dict(zip(["status", "owner", "attempts", "last_error"], row)) if row else None
+
+def test_claim_leases_each_job_once(queue):
+    queue.enqueue(["a", "b"], "scrape")
+
+    assert queue.claim("w1", "scrape", limit=1) == ["a"]
+    assert queue.claim("w2", "scrape", limit=5) == ["b"]
+    assert queue.claim("w3", "scrape", limit=5) == []
+    assert job(queue, "scrape", "a") == {"status": "leased", "owner": "w1", "attempts": 1, "last_error": None}
+
+def test_claim_only_requested_urls(queue):
+    queue.enqueue(["a", "b"], "scrape")
+
+    assert queue.claim("w1", "scrape", limit=5, urls=["b", "c"]) == ["b"]
+
+def test_enqueue_requeue_leaves_leased_jobs(queue):
+    queue.enqueue(["a", "b"], "scrape")
+    queue.claim("w1", "scrape", urls=["a"])
+    queue.claim("w1", "scrape", urls=["b"])
+    queue.complete("w1", "scrape", "b")
+
+    assert queue.enqueue(["a", "b"], "scrape") == 0
+    assert queue.enqueue(["a", "b"], "scrape", requeue=True) == 1
+    assert job(queue, "scrape", "a")["status"] == "leased"
+    assert job(queue, "scrape", "b") == {"status": "pending", "owner": None, "attempts": 0, "last_error": None}
+
+def test_expired_lease_is_reclaimed(queue):
+    queue.enqueue(["a"], "scrape")
+    queue.claim("w1", "scrape", lease_seconds=-1)
+
+    assert queue.claim("w2", "scrape") == ["a"]
+    assert job(queue, "scrape", "a")["owner"] == "w2"
+    # The first worker finishing late must not overwrite the new lease
+    assert not queue.renew("w1", "scrape", "a")
+    assert not queue.complete("w1", "scrape", "a", next_stage="extract")
+    assert job(queue, "scrape", "a")["status"] == "leased"
+    assert job(queue, "extract", "a") is None
+
+def test_live_lease_is_not_reclaimed(queue):
+    queue.enqueue(["a"], "scrape")
+    queue.claim("w1", "scrape", lease_seconds=-1)
+
+    assert queue.renew("w1", "scrape", "a", lease_seconds=60)
+    assert queue.claim("w2", "scrape") == []
+
+def test_expired_lease_on_last_attempt_is_failed(queue):
+    queue.enqueue(["a"], "scrape")
+    queue.claim("w1", "scrape", lease_seconds=-1)
+    queue.claim("w2", "scrape", lease_seconds=-1)
+
+    assert queue.claim("w3", "scrape") == []
+    assert job(queue, "scrape", "a") == {"status": "failed", "owner": None, "attempts": 2, "last_error": "lease expired"}
+
+def test_fail_returns_job_until_out_of_attempts(queue):
+    queue.enqueue(["a"], "scrape")
+
+    queue.claim("w1", "scrape")
+    queue.fail("w1", "scrape", "a", "timeout")
+    assert job(queue, "scrape", "a") == {"status": "pending", "owner": None, "attempts": 1, "last_error": "timeout"}
+
+    assert queue.claim("w1", "scrape") == ["a"]
+    queue.fail("w1", "scrape", "a", "timeout again")
+    assert job(queue, "scrape", "a") == {"status": "failed", "owner": None, "attempts": 2, "last_error": "timeout again"}
+    assert queue.claim("w1", "scrape") == []
+    assert queue.stats() == {"scrape": {"failed": 1}}
+
+def test_fail_without_lease_changes_nothing(queue):
+    queue.enqueue(["a"], "scrape")
+    queue.claim("w1", "scrape")
+
+    queue.fail("w2", "scrape", "a", "not mine")
+    assert job(queue, "scrape", "a")["status"] == "leased"
+
+def test_complete_queues_next_stage(queue):
+    queue.enqueue(["a"], "scrape")
+    queue.claim("w1", "scrape")
+
+    assert queue.complete("w1", "scrape", "a", next_stage="extract")
+    assert job(queue, "scrape", "a")["status"] == "done"
+    assert job(queue, "extract", "a") == {"status": "pending", "owner": None, "attempts": 0, "last_error": None}
+
+def test_complete_resets_finished_next_stage(queue):
+    queue.enqueue(["a"], "scrape")
+    queue.enqueue(["a"], "extract")
+    queue.claim("w1", "extract")
+    queue.fail("w1", "extract", "a", "bad output")
+    queue.claim("w1", "extract")
+    queue.fail("w1", "extract", "a", "bad output")
+    assert job(queue, "extract", "a")["status"] == "failed"
+
+    queue.claim("w1", "scrape")
+    assert queue.complete("w1", "scrape", "a", next_stage="extract")
+    assert job(queue, "extract", "a") == {"status": "pending", "owner": None, "attempts": 0, "last_error": None}
+
+def test_complete_leaves_leased_next_stage(queue):
+    queue.enqueue(["a"], "scrape")
+    queue.enqueue(["a"], "extract")
+    queue.claim("w2", "extract")
+    queue.claim("w1", "scrape")
+
+    assert queue.complete("w1", "scrape", "a", next_stage="extract")
+    assert job(queue, "extract", "a") == {"status": "leased", "owner": "w2", "attempts": 1, "last_error": None}
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+import store
+
+PROFILES = [
+    {"name": "Ada", "headline": "Engineer", "experience": [{"company": "Analytical, Ltd."}]},
+    {"name": "Grace \"Amazing\" Hopper", "headline": "Rear Admiral ]", "education": []},
+    {"name": "Alan", "headline": None, "score": -12.5e3, "flags": [True, False, None]},
+]
+
+def write(workspace, text):
+    path = workspace / "tempfile.txt"
+    path.write_text(text)
+    return str(path)
+
+@pytest.mark.parametrize("read_size", [1, 2, 7, 64, 64 * 1024])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_profiles_across_read_boundaries(workspace, monkeypatch, read_size, indent):
+    monkeypatch.setattr(store, "STREAM_READ_SIZE", read_size)
+    path = write(workspace, json.dumps(PROFILES, indent=indent))
+
+    assert list(store.iter_profiles(path)) == PROFILES
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 64])
+def test_iter_profiles_scalars_split_by_reads(workspace, monkeypatch, read_size):
+    monkeypatch.setattr(store, "STREAM_READ_SIZE", read_size)
+    text = '[1, 23 ,\n 4.5e3, true, null, "x", [1,2],-7]'
+
+    assert list(store.iter_profiles(write(workspace, text))) == json.loads(text)
+
+@pytest.mark.parametrize("text", ["[]", "  [ ]  \n", "\n[\n]"])
+def test_iter_profiles_empty_array(workspace, text):
+    assert list(store.iter_profiles(write(workspace, text))) == []
+
+@pytest.mark.parametrize("text", [
+    "",
+    "   ",
+    "[1 2 3]",
+    '[{"name": "Ada"} {"name": "Alan"}]',
+    '[{"name": "Ada"},]',
+    "[,1]",
+    "[1,,2]",
+    '[{"name": "Ada"}] x',
+    '[{"name": "Ada"}][]',
+    '[{"name": "Ada"}',
+    '[{"name": "Ada"',
+    '[{"name": "Ada"}, {"name": "Al',
+    "[tru]",
+])
+@pytest.mark.parametrize("read_size", [1, 4, 64 * 1024])
+def test_iter_profiles_rejects_what_json_rejects(workspace, monkeypatch, text, read_size):
+    monkeypatch.setattr(store, "STREAM_READ_SIZE", read_size)
+    path = write(workspace, text)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(text)
+
+    with pytest.raises(json.JSONDecodeError):
+        list(store.iter_profiles(path))
+
+def test_iter_profiles_requires_an_array(workspace):
+    with pytest.raises(json.JSONDecodeError):
+        list(store.iter_profiles(write(workspace, '{"name": "Ada"}')))
+
+def test_iter_profiles_yields_before_reading_everything(workspace, monkeypatch):
+    monkeypatch.setattr(store, "STREAM_READ_SIZE", 16)
+    # The corruption is after the first element, so that element still comes out first
+    profiles = store.iter_profiles(write(workspace, '[{"name": "Ada"}, oops]'))
+
+    assert next(profiles) == {"name": "Ada"}
+    with pytest.raises(json.JSONDecodeError):
+        next(profiles)
+
+def test_stream_profiles_ndjson_projects_fields(workspace):
+    write(workspace, json.dumps(PROFILES))
+
+    body = b"".join(store.stream_profiles_ndjson(["name"]))
+
+    assert [json.loads(line) for line in body.splitlines()] == [{"name": p["name"]} for p in PROFILES]
+
+def test_stream_profiles_json_matches_store(workspace):
+    write(workspace, json.dumps(PROFILES))
+
+    assert json.loads(b"".join(store.stream_profiles_json(None))) == PROFILES
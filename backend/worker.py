@@ -0,0 +1,184 @@
+"""
+Queue worker for the scrape and extract stages.
+
+Any number of these can run next to the API and the scheduler on the same
+host: jobs are leased through the SQLite work queue, so each URL is handled
+by one worker at a time, and a crashed worker's jobs are picked up again
+once their lease expires.
+
+    python worker.py --stage scrape
+    python worker.py --stage extract --batch 4
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+import coordination
+import store
+from coordination import WorkQueue
+
+CHOPPED_DIR = Path("data/chopped/data")
+STAGES = ["scrape", "extract"]
+
+def save_chopped(html_path: Path) -> Path:
+    """
+    Clean a saved profile page into data/chopped/data and remove the HTML.
+
+    Pages are saved as <profile>_<timestamp>.html, so each scrape of a profile
+    gets a new name; older chopped copies of the same profile are deleted so
+    extraction never reads a stale one and the directory doesn't grow per run.
+    """
+    from chop import clean_html
+
+    CHOPPED_DIR.mkdir(parents=True, exist_ok=True)
+    chopped_path = CHOPPED_DIR / html_path.with_suffix('.txt').name
+    chopped_path.write_text(clean_html(html_path.read_text(encoding='utf-8')), encoding='utf-8')
+    html_path.unlink()
+
+    profile_id = _profile_id(chopped_path)
+    for old_path in CHOPPED_DIR.glob("*.txt"):
+        if old_path != chopped_path and _profile_id(old_path) == profile_id:
+            old_path.unlink(missing_ok=True)
+    return chopped_path
+
+def _profile_id(path: Path) -> str:
+    # Strip the _YYYYmmdd_HHMMSS suffix added by save_html
+    parts = path.stem.rsplit("_", 2)
+    return parts[0] if len(parts) == 3 and parts[1].isdigit() and parts[2].isdigit() else path.stem
+
+def scrape_jobs(queue: WorkQueue, owner: str, urls: list[str], driver, scratch_dir: str, lease_seconds: float) -> None:
+    """Save and clean each profile page, then hand the URL on to the extract stage."""
+    from scrape_profile import save_html
+
+    for url in urls:
+        # Long batches can outlive the lease; skip URLs another worker has taken over
+        if not queue.renew(owner, "scrape", url, lease_seconds):
+            continue
+        try:
+            filename = save_html(driver, url, scratch_dir)
+            if not filename:
+                raise RuntimeError("Failed to save page")
+
+            save_chopped(Path(filename))
+            queue.complete(owner, "scrape", url, next_stage="extract")
+        except Exception as e:
+            print(f"Error scraping {url}: {e}")
+            queue.fail(owner, "scrape", url, str(e))
+        time.sleep(2)  # Small delay between profiles
+
+def extract_jobs(queue: WorkQueue, owner: str, urls: list[str], gemini_api_key: str, lease_seconds: float) -> None:
+    """Extract each profile with Gemini and upsert it into the profile store."""
+    from llm import process_linkedin_url, parse_gemini_profile
+
+    for url in urls:
+        if not queue.renew(owner, "extract", url, lease_seconds):
+            continue
+        try:
+            response = process_linkedin_url(url, gemini_api_key)
+            parsed_data = parse_gemini_profile(url, response["gemini_response"])
+            if parsed_data.get("error"):
+                raise ValueError(parsed_data["parse_error"])
+
+            store.upsert_profile(url, parsed_data)
+            queue.complete(owner, "extract", url)
+            print(f"Successfully processed and saved profile for {url}")
+        except Exception as e:
+            print(f"Error processing {url}: {e}")
+            queue.fail(owner, "extract", url, str(e))
+
+def run_worker(
+    stages: list[str],
+    queue: Optional[WorkQueue] = None,
+    owner: Optional[str] = None,
+    batch: int = 1,
+    lease_seconds: float = coordination.DEFAULT_LEASE_SECONDS,
+    poll_interval: float = 5,
+    exit_when_idle: bool = False,
+) -> int:
+    """
+    Claim and process jobs until stopped, or until the queue is drained.
+
+    Args:
+        stages: Stages this worker handles, in priority order
+        queue: Work queue, defaults to the shared data/queue/queue.db
+        owner: Lease owner id, defaults to one derived from host and pid
+        batch: Jobs claimed per round trip to the queue
+        lease_seconds: How long a claimed job stays reserved for this worker
+        poll_interval: Seconds to wait when there is nothing to do
+        exit_when_idle: Return once no stage has claimable jobs
+
+    Returns:
+        int: Number of jobs processed
+    """
+    queue = queue or WorkQueue()
+    owner = owner or coordination.worker_id()
+    gemini_api_key = os.getenv("GEMINI_API_KEY")
+    if "extract" in stages and not gemini_api_key:
+        raise RuntimeError("GEMINI_API_KEY environment variable not set")
+
+    driver = None
+    scratch_dir = tempfile.mkdtemp(prefix=f"{owner}-")
+    processed = 0
+    try:
+        while True:
+            idle = True
+            for stage in stages:
+                urls = queue.claim(owner, stage, batch, lease_seconds)
+                if not urls:
+                    continue
+                idle = False
+
+                if stage == "scrape":
+                    if driver is None:
+                        driver = _login()
+                    scrape_jobs(queue, owner, urls, driver, scratch_dir, lease_seconds)
+                else:
+                    extract_jobs(queue, owner, urls, gemini_api_key, lease_seconds)
+                processed += len(urls)
+
+            if idle:
+                if exit_when_idle:
+                    return processed
+                time.sleep(poll_interval)
+    finally:
+        if driver is not None:
+            driver.quit()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+def _login():
+    """Start a browser and log in to LinkedIn for the scrape stage."""
+    from selenium import webdriver
+    from scrape_profile import login_to_linkedin
+
+    driver = webdriver.Chrome()
+    if not login_to_linkedin(driver, os.getenv("LINKEDIN_EMAIL"), os.getenv("LINKEDIN_PASSWORD")):
+        driver.quit()
+        raise RuntimeError("Failed to login. Please check your credentials and try again.")
+    return driver
+
+def main():
+    parser = argparse.ArgumentParser(description="Process scrape/extract jobs from the shared work queue.")
+    parser.add_argument("--stage", choices=STAGES + ["all"], default="all", help="Stage to work on")
+    parser.add_argument("--batch", type=int, default=1, help="Jobs claimed at a time")
+    parser.add_argument("--lease-seconds", type=float, default=coordination.DEFAULT_LEASE_SECONDS)
+    parser.add_argument("--poll-interval", type=float, default=5)
+    parser.add_argument("--exit-when-idle", action="store_true", help="Stop once the queue is drained")
+    parser.add_argument("--enqueue", action="store_true", help="Queue every URL in url.txt for scraping first")
+    args = parser.parse_args()
+
+    load_dotenv()
+    queue = WorkQueue()
+    if args.enqueue:
+        print(f"Queued {queue.enqueue(store.read_urls(), 'scrape', requeue=True)} URLs")
+
+    stages = STAGES if args.stage == "all" else [args.stage]
+    processed = run_worker(stages, queue, batch=args.batch, lease_seconds=args.lease_seconds,
+                           poll_interval=args.poll_interval, exit_when_idle=args.exit_when_idle)
+    print(f"Processed {processed} jobs")
+
+if __name__ == "__main__":
+    main()